@@ -0,0 +1,105 @@
+"""Measure the per-message cost of text canonicalization before the content filters.
+
+Times ``canonicalize`` on typical and adversarial messages next to
+``contains_link`` itself, and exits non-zero if any mix averages more than
+``BUDGET_US`` microseconds, an evasion is no longer caught, or ordinary prose
+in ``FALSE_POSITIVES`` turns into a link.
+
+Run from the repository root::
+
+    python benchmarks/bench_canonicalize.py [messages]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.links import contains_link  # noqa: E402
+from utils.textnorm import canonicalize  # noqa: E402
+
+BUDGET_US = 20.0  # average microseconds allowed per message
+
+WORDS = ["hello", "everyone", "meeting", "tomorrow", "thanks", "see", "you", "there", "ok", "great"]
+RU_WORDS = ["привет", "всем", "встреча", "завтра", "спасибо", "до", "скорого", "отлично"]
+EVASIONS = [
+    "join ｔ．ｍｅ/freecrypto now",
+    "free money at t . me/scam",
+    "dm me 𝐭.𝐦𝐞/𝐬𝐩𝐚𝐦 today",
+    "tеlеgrаm.me/x (cyrillic vowels)",
+    "t​.​me/zero_width",
+    "visit example[.]com or shop . xyz/promo",
+    "free coins at example dot com/claim",
+    "t(dot)me/spam",
+    "spаm.сom (mixed script)",
+]
+# Prose that must never canonicalize into a link
+FALSE_POSITIVES = [
+    "end it with a period (.) please",
+    "I said (dot) that",
+    "the <.> operator",
+    "Meet at 5 . Net profit",
+    "went home. Net result",
+    "I can't . me",
+    "remember the dot com bubble",
+    "my website dot net",
+    "the shop . com is down",
+    "ООО.РОС",
+    "ТОР.КАК",
+]
+
+
+def _mix(rng: random.Random, count: int) -> dict[str, list[str]]:
+    def sentence(words: list[str]) -> str:
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(3, 30)))
+        return text + rng.choice(("", ".", ". Ok.", "!", "?"))
+
+    return {
+        "ascii chat": [sentence(WORDS) for _ in range(count)],
+        "cyrillic chat": [sentence(RU_WORDS) for _ in range(count)],
+        "emoji chat": [sentence(WORDS) + " 👍👨‍👩‍👧" for _ in range(count)],
+        "evasion spam": [rng.choice(EVASIONS) for _ in range(count)],
+        "tricky prose": [rng.choice(FALSE_POSITIVES) for _ in range(count)],
+    }
+
+
+def _per_call(fn, texts: list[str]) -> float:
+    start = time.perf_counter()
+    for text in texts:
+        fn(text)
+    return (time.perf_counter() - start) / len(texts) * 1e6
+
+
+def main(count: int = 50_000) -> None:
+    rng = random.Random(42)
+    worst = 0.0
+    print(f"{'mix':<15} {'canonicalize':>13} {'contains_link':>14} {'caught raw→canonical':>22}")
+    for label, texts in _mix(rng, count).items():
+        canon = _per_call(canonicalize, texts)
+        link = _per_call(contains_link, texts)
+        raw_hits = sum(contains_link(t) for t in texts)
+        canon_hits = sum(contains_link(canonicalize(t)) for t in texts)
+        worst = max(worst, canon)
+        print(f"{label:<15} {canon:10.2f} µs {link:11.2f} µs {raw_hits:>10,} → {canon_hits:,}")
+
+    missed = [t for t in EVASIONS if not contains_link(canonicalize(t))]
+    invented = [t for t in FALSE_POSITIVES if contains_link(canonicalize(t))]
+    for text in missed:
+        print(f"MISSED: {text!r} → {canonicalize(text)!r}")
+    for text in invented:
+        print(f"FALSE POSITIVE: {text!r} → {canonicalize(text)!r}")
+    # Blacklist patterns are canonicalized too; a Latin word must not match its Cyrillic look-alike
+    if canonicalize("cop") in canonicalize("сор"):
+        invented.append("сор")
+        print("FALSE POSITIVE: blacklisted 'cop' matches Russian 'сор'")
+
+    verdict = "within" if worst <= BUDGET_US else "OVER"
+    print(f"\nworst mix: {worst:.2f} µs/msg ({verdict} the {BUDGET_US:.0f} µs budget)")
+    if worst > BUDGET_US or missed or invented:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
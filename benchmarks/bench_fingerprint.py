@@ -0,0 +1,50 @@
+"""Measure FingerprintIndex insert and lookup cost.
+
+Run from the repository root::
+
+    python benchmarks/bench_fingerprint.py [messages]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fingerprint import FingerprintIndex  # noqa: E402
+
+WORDS = [f"word{i}" for i in range(5000)]
+
+
+def _message(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+
+
+def main(count: int = 50_000) -> None:
+    rng = random.Random(42)
+    unique = [_message(rng) for _ in range(count)]
+    index = FingerprintIndex(window=600, max_entries=count)
+
+    start = time.perf_counter()
+    for i, text in enumerate(unique):
+        index.observe(i % 500, text, now=i / 1000)
+    insert = time.perf_counter() - start
+
+    # Re-send the same payloads (slightly altered) from other chats
+    altered = [text + " join now" for text in unique]
+    start = time.perf_counter()
+    hits = 0
+    for i, text in enumerate(altered):
+        if index.observe((i + 1) % 500, text, now=count / 1000 + i / 1000) > 1:
+            hits += 1
+    lookup = time.perf_counter() - start
+
+    print(f"entries:  {len(index)}")
+    print(f"insert:   {insert / count * 1e6:.1f} µs/msg ({count / insert:,.0f} msg/s)")
+    print(f"lookup:   {lookup / count * 1e6:.1f} µs/msg ({count / lookup:,.0f} msg/s)")
+    print(f"near-dup: {hits / count:.1%} of altered copies matched")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
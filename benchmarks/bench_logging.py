@@ -0,0 +1,65 @@
+"""Measure the per-message cost of logging on the calling (event loop) thread.
+
+Compares the old synchronous ``basicConfig`` handler with the queue-based
+pipeline from ``utils.logsetup``. Output goes to /dev/null.
+
+Run from the repository root::
+
+    python benchmarks/bench_logging.py [messages]
+"""
+
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import logsetup  # noqa: E402
+
+logger = logging.getLogger("handlers.general")
+
+
+def _per_call(count: int) -> float:
+    text = "hello world " * 8
+    start = time.perf_counter()
+    for i in range(count):
+        logger.debug("[GROUP FALLBACK] chat=%s user=%s text=%s", -100123, i, text)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def _sync_setup(level: int) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(logging.Formatter(logsetup.TEXT_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def main(count: int = 100_000) -> None:
+    sys.stderr = open(os.devnull, "w")
+    results = []
+
+    _sync_setup(logging.INFO)
+    results.append(("sync, debug off", _per_call(count)))
+    _sync_setup(logging.DEBUG)
+    results.append(("sync, debug on", _per_call(count)))
+
+    for label, fmt, sampling in (
+        ("queue, debug on", "text", ""),
+        ("queue+json, debug on", "json", ""),
+        ("queue, debug on, 1% sampled", "text", "handlers.general=0.01"),
+    ):
+        logsetup.setup_logging("DEBUG", fmt, sampling)
+        results.append((label, _per_call(count)))
+        logsetup.stop_logging()
+
+    sys.stderr = sys.__stderr__
+    for label, cost in results:
+        print(f"{label:<30} {cost:6.2f} µs/msg")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
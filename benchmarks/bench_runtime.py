@@ -0,0 +1,107 @@
+"""Sweep runtime settings against a real MongoDB and report the fastest.
+
+Simulates the per-message lookups done by ``moderate_message`` (settings and
+approval reads) with N concurrent workers, for every combination of event
+loop, Motor pool size and worker count. Uses ``MONGO_URI`` and a scratch
+database, so point it at a staging cluster rather than production.
+
+Run from the repository root::
+
+    python benchmarks/bench_runtime.py [seconds-per-run]
+"""
+
+import asyncio
+import itertools
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient  # noqa: E402
+
+from config import MONGO_URI, RUNTIME_PROFILES  # noqa: E402
+
+BENCH_DB = "oxygen_runtime_bench"
+CHATS = 200
+USERS = 5_000
+
+LOOPS = ["asyncio", "uvloop"]
+POOL_SIZES = sorted({p["MONGO_MAX_POOL_SIZE"] for p in RUNTIME_PROFILES.values()})
+WORKERS = sorted({p["BOT_WORKERS"] for p in RUNTIME_PROFILES.values()})
+
+
+async def _seed() -> None:
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[BENCH_DB]
+    await db.kv_settings.delete_many({})
+    await db.approved_users.delete_many({})
+    await db.kv_settings.create_index([("chat_id", 1), ("key", 1)], unique=True)
+    await db.approved_users.create_index([("chat_id", 1), ("user_id", 1)], unique=True)
+    await db.kv_settings.insert_many(
+        [{"chat_id": c, "key": "linkfilter", "value": "1"} for c in range(CHATS)]
+    )
+    await db.approved_users.insert_many(
+        [{"chat_id": c, "user_id": u} for c in range(CHATS) for u in range(0, USERS, 50)]
+    )
+    client.close()
+
+
+async def _drop() -> None:
+    client = AsyncIOMotorClient(MONGO_URI)
+    await client.drop_database(BENCH_DB)
+    client.close()
+
+
+async def _run(pool: int, workers: int, seconds: float) -> tuple[float, float]:
+    client = AsyncIOMotorClient(MONGO_URI, maxPoolSize=pool, minPoolSize=min(pool, 5))
+    db = client[BENCH_DB]
+    latencies: list[float] = []
+    deadline = time.monotonic() + seconds
+
+    async def worker() -> None:
+        rng = random.Random()
+        while time.monotonic() < deadline:
+            chat, user = rng.randrange(CHATS), rng.randrange(USERS)
+            start = time.perf_counter()
+            await db.approved_users.find_one({"chat_id": chat, "user_id": user})
+            await db.kv_settings.find_one({"chat_id": chat, "key": "linkfilter"})
+            latencies.append(time.perf_counter() - start)
+
+    await client.admin.command("ping")
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    client.close()
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e3 if latencies else 0.0
+    return len(latencies) / seconds, p99
+
+
+def main(seconds: float = 5.0) -> None:
+    asyncio.run(_seed())
+
+    results = []
+    for loop_name, pool, workers in itertools.product(LOOPS, POOL_SIZES, WORKERS):
+        if loop_name == "uvloop":
+            try:
+                import uvloop
+            except ImportError:
+                continue
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        else:
+            asyncio.set_event_loop_policy(None)
+        rate, p99 = asyncio.run(_run(pool, workers, seconds))
+        results.append((rate, p99, loop_name, pool, workers))
+        print(f"{loop_name:<8} pool={pool:<4} workers={workers:<3} {rate:8.0f} msg/s  p99 {p99:6.1f} ms")
+
+    asyncio.set_event_loop_policy(None)
+    asyncio.run(_drop())
+    best = max(results)
+    print(
+        f"\nBest: USE_UVLOOP={best[2] == 'uvloop'} MONGO_MAX_POOL_SIZE={best[3]} "
+        f"BOT_WORKERS={best[4]} ({best[0]:.0f} msg/s, p99 {best[1]:.1f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)
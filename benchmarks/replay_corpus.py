@@ -0,0 +1,384 @@
+"""Replay a message corpus through the moderation filters without Telegram.
+
+Streams a Telegram Desktop chat export (``result.json``) or a JSONL corpus
+through the same checks ``moderate_message`` runs, in the same order, and
+reports throughput, what each check would have removed and, given a second
+rule set, every message whose verdict changes between the two.
+
+Stateless checks (bio, blacklist, links) run in a process pool on chunks of
+messages; flood and spam depend on message order and run in this process.
+Only a bounded window of chunks is in flight and the flood/spam state is
+capped, so memory stays flat however large the input is.
+
+JSONL lines look like ``{"chat_id": -100…, "id": 1, "user_id": 42,
+"date": 1700000000, "text": "…", "bio": "…"}``; only ``text`` is required.
+A rule file is JSON with any of::
+
+    {"checks": ["bio", "flood", "spam", "blacklist", "links"],
+     "linkfilter": true, "blacklist": ["word"], "allow": ["example.com"],
+     "block": ["spam.example"], "flood_limit": 5, "flood_window": 10,
+     "spam_threshold": 3, "spam_window": 600}
+
+Text and bios are canonicalized first, as in the bot. Missing keys fall
+back to the bot's defaults and environment (no bot credentials needed). Admin and
+approval exemptions need live data and are not applied.
+
+Run from the repository root::
+
+    python benchmarks/replay_corpus.py export.json [--rules old.json] [--against new.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.domains import DomainPolicy  # noqa: E402
+from utils.fingerprint import FingerprintIndex  # noqa: E402
+from utils.flood import FloodTracker  # noqa: E402
+from utils.links import contains_link, has_forbidden_link  # noqa: E402
+from utils.matcher import KeywordMatcher  # noqa: E402
+from utils.plan import CHECK_ORDER, FLOOD_DEFAULT_LIMIT, FLOOD_DEFAULT_WINDOW  # noqa: E402
+from utils.textnorm import canonicalize  # noqa: E402
+
+# Read from the environment like config does, but without importing it: config
+# insists on the bot's credentials and this tool never talks to Telegram
+ALLOWED_DOMAINS = [d.strip() for d in os.environ.get("ALLOWED_DOMAINS", "").split(",") if d.strip()]
+BLOCKED_DOMAINS = [d.strip() for d in os.environ.get("BLOCKED_DOMAINS", "").split(",") if d.strip()]
+SPAM_CHAT_THRESHOLD = int(os.environ.get("SPAM_CHAT_THRESHOLD", "3"))
+SPAM_WINDOW = int(os.environ.get("SPAM_WINDOW", "600"))
+FLOOD_MAX_TRACKED = int(os.environ.get("FLOOD_MAX_TRACKED", "100000"))  # "medium" profile
+SPAM_MAX_FINGERPRINTS = int(os.environ.get("SPAM_MAX_FINGERPRINTS", "50000"))
+
+READ_SIZE = 1 << 20  # characters read from the export at a time
+CHUNK_SIZE = 2_000  # messages per worker task
+STATELESS = ("bio", "blacklist", "links")  # evaluated in the pool
+REPLAY_CHECKS = tuple(c for c in CHECK_ORDER if c != "approval")
+CLEAN = "-"  # verdict of a message no check removes
+
+
+# ------------------ RULES ------------------ #
+@dataclass(frozen=True)
+class RuleSet:
+    name: str
+    checks: tuple[str, ...]
+    linkfilter: bool
+    blacklist: tuple[str, ...]
+    allow: tuple[str, ...]
+    block: tuple[str, ...]
+    flood_limit: int
+    flood_window: int
+    spam_threshold: int
+    spam_window: int
+
+
+def load_rules(path: str | None) -> RuleSet:
+    raw = {}
+    if path:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+    checks = raw.get("checks", REPLAY_CHECKS)
+    unknown = set(checks) - set(REPLAY_CHECKS)
+    if unknown:
+        raise SystemExit(f"{path}: unknown checks {sorted(unknown)}")
+    spam_threshold = int(raw.get("spam_threshold", SPAM_CHAT_THRESHOLD))
+    return RuleSet(
+        name=os.path.basename(path) if path else "defaults",
+        checks=tuple(c for c in REPLAY_CHECKS if c in checks and (c != "spam" or spam_threshold > 0)),
+        linkfilter=bool(raw.get("linkfilter", True)),
+        blacklist=tuple(raw.get("blacklist", ())),
+        allow=tuple(ALLOWED_DOMAINS) + tuple(raw.get("allow", ())),
+        block=tuple(BLOCKED_DOMAINS) + tuple(raw.get("block", ())),
+        flood_limit=int(raw.get("flood_limit", FLOOD_DEFAULT_LIMIT)),
+        flood_window=int(raw.get("flood_window", FLOOD_DEFAULT_WINDOW)),
+        spam_threshold=spam_threshold,
+        spam_window=int(raw.get("spam_window", SPAM_WINDOW)),
+    )
+
+
+# ------------------ CORPUS READERS ------------------ #
+def _flatten(text) -> str:
+    """Telegram exports store formatted text as a list of strings and entity dicts."""
+    if isinstance(text, list):
+        return "".join(part if isinstance(part, str) else part.get("text", "") for part in text)
+    return text or ""
+
+
+def _timestamp(value) -> float:
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        return float(value)
+    if value:
+        return datetime.fromisoformat(value).timestamp()
+    return 0.0
+
+
+def _sender(value) -> int:
+    if isinstance(value, int):
+        return value
+    digits = re.sub(r"\D", "", value or "")
+    return int(digits) if digits else 0
+
+
+def read_jsonl(path: str):
+    with open(path, encoding="utf-8") as fh:
+        for number, line in enumerate(fh, 1):
+            if not line.strip():
+                continue
+            doc = json.loads(line)
+            yield (
+                doc.get("chat_id", 0),
+                doc.get("id", doc.get("message_id", number)),
+                _sender(doc.get("user_id", doc.get("from_id"))),
+                _timestamp(doc.get("date")),
+                _flatten(doc.get("text")),
+                doc.get("bio") or "",
+            )
+
+
+def read_export(path: str):
+    """Yield messages from a single-chat Telegram export one object at a time."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as fh:
+        buf = ""
+        eof = False
+        start = None
+        while start is None:
+            chunk = fh.read(READ_SIZE)
+            eof = not chunk
+            buf += chunk
+            found = re.search(r'"messages"\s*:\s*\[', buf)
+            if found:
+                start = found.end()
+            elif eof:
+                raise SystemExit(f"{path}: no \"messages\" array; export a single chat as JSON")
+        header = re.search(r'"id"\s*:\s*(-?\d+)', buf[:start])
+        chat_id = int(header.group(1)) if header else 0
+
+        pos = start
+        offset = 0  # characters dropped from the front of buf
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                if pos >= len(buf):
+                    raise ValueError("need more input")
+                doc, pos = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise SystemExit(f"{path}: truncated or malformed export at character {offset + pos}")
+                chunk = fh.read(READ_SIZE)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                offset += pos
+                pos = 0
+                continue
+            if doc.get("type") == "message":
+                yield (
+                    chat_id,
+                    doc.get("id", 0),
+                    _sender(doc.get("from_id")),
+                    _timestamp(doc.get("date_unixtime") or doc.get("date")),
+                    _flatten(doc.get("text")),
+                    "",
+                )
+
+
+def chunked(messages, size: int):
+    chunk = []
+    for msg in messages:
+        chunk.append(msg)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ------------------ WORKERS ------------------ #
+_compiled: list[tuple[RuleSet, KeywordMatcher, DomainPolicy]] = []
+
+
+def _init_worker(rule_sets: list[RuleSet]) -> None:
+    global _compiled
+    _compiled = [
+        (r, KeywordMatcher(canonicalize(word) for word in r.blacklist), DomainPolicy(r.allow, r.block))
+        for r in rule_sets
+    ]
+
+
+def _stateless(check: str, rules: RuleSet, matcher, policy, text: str, bio: str) -> bool:
+    if check == "bio":
+        return contains_link(bio)
+    if check == "blacklist":
+        return bool(text) and matcher.search(text) is not None
+    return bool(text) and has_forbidden_link(text, policy, rules.linkfilter)
+
+
+def evaluate_chunk(items: list[tuple[str, str]]) -> tuple[list[list[frozenset]], list[Counter], float]:
+    """Run the stateless checks of every rule set on canonical text.
+
+    Returns hits per message and seconds per check for each rule set, plus
+    the seconds spent canonicalizing.
+    """
+    hits: list[list[frozenset]] = []
+    timings: list[Counter] = []
+    clock = time.perf_counter
+    t0 = clock()
+    items = [(canonicalize(text), canonicalize(bio)) for text, bio in items]
+    canonical_seconds = clock() - t0
+    for rules, matcher, policy in _compiled:
+        version_hits = []
+        spent: Counter = Counter()
+        active = [c for c in rules.checks if c in STATELESS]
+        for text, bio in items:
+            found = []
+            for check in active:
+                t0 = clock()
+                if _stateless(check, rules, matcher, policy, text, bio):
+                    found.append(check)
+                spent[check] += clock() - t0
+            version_hits.append(frozenset(found))
+        hits.append(version_hits)
+        timings.append(spent)
+    return hits, timings, canonical_seconds
+
+
+# ------------------ ORDERED CHECKS ------------------ #
+class Replayer:
+    """Applies one rule set's checks in plan order, keeping flood/spam state across chunks."""
+
+    def __init__(self, rules: RuleSet) -> None:
+        self.rules = rules
+        self.flood = FloodTracker(buckets=10, max_entries=FLOOD_MAX_TRACKED)
+        self.spam = FingerprintIndex(window=rules.spam_window, max_entries=SPAM_MAX_FINGERPRINTS)
+        self.verdicts: Counter = Counter()
+        self.seconds: Counter = Counter()
+
+    def verdict(self, msg: tuple, found: frozenset, content: str) -> str:
+        chat_id, _, user_id, ts, _, _ = msg
+        rules = self.rules
+        for check in rules.checks:
+            if check in STATELESS:
+                hit = check in found
+            elif check == "flood":
+                t0 = time.perf_counter()
+                hit = self.flood.hit((chat_id, user_id), rules.flood_window, now=ts) > rules.flood_limit
+                if hit:
+                    self.flood.reset((chat_id, user_id))
+                self.seconds[check] += time.perf_counter() - t0
+            else:
+                t0 = time.perf_counter()
+                hit = bool(content) and self.spam.observe(chat_id, content, now=ts) > rules.spam_threshold
+                self.seconds[check] += time.perf_counter() - t0
+            if hit:
+                self.verdicts[check] += 1
+                return check
+        self.verdicts[CLEAN] += 1
+        return CLEAN
+
+
+def _results(pool, chunks, window: int):
+    """Yield (chunk, result) in input order with at most ``window`` chunks in flight."""
+    if pool is None:
+        for chunk in chunks:
+            yield chunk, evaluate_chunk([(m[4], m[5]) for m in chunk])
+        return
+    inflight: deque = deque()
+    for chunk in chunks:
+        inflight.append((chunk, pool.submit(evaluate_chunk, [(m[4], m[5]) for m in chunk])))
+        if len(inflight) >= window:
+            done, future = inflight.popleft()
+            yield done, future.result()
+    while inflight:
+        done, future = inflight.popleft()
+        yield done, future.result()
+
+
+def replay(path: str, fmt: str, rule_sets: list[RuleSet], workers: int, show: int) -> None:
+    reader = read_jsonl if fmt == "jsonl" else read_export
+    replayers = [Replayer(r) for r in rule_sets]
+    stateless_seconds = [Counter() for _ in rule_sets]
+    transitions: Counter = Counter()
+    examples: list[tuple] = []
+    total = 0
+    canonical_seconds = 0.0
+    spam = any("spam" in r.checks for r in rule_sets)
+
+    pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(rule_sets,)) if workers else None
+    if pool is None:
+        _init_worker(rule_sets)
+    started = time.perf_counter()
+    try:
+        for chunk, (hits, timings, canonical) in _results(
+            pool, chunked(reader(path), CHUNK_SIZE), max(2, workers * 2)
+        ):
+            canonical_seconds += canonical
+            for i, spent in enumerate(timings):
+                stateless_seconds[i].update(spent)
+            for n, msg in enumerate(chunk):
+                # The spam index runs here and needs the text the bot would see
+                content = canonicalize(msg[4]) if spam else ""
+                verdicts = [rp.verdict(msg, hits[i][n], content) for i, rp in enumerate(replayers)]
+                if len(verdicts) == 2 and verdicts[0] != verdicts[1]:
+                    transitions[tuple(verdicts)] += 1
+                    if len(examples) < show:
+                        examples.append((msg, verdicts))
+            total += len(chunk)
+            if total % (CHUNK_SIZE * 50) == 0:
+                print(f"… {total:,} messages", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - started
+
+    print(f"messages: {total:,} in {elapsed:.2f}s ({total / elapsed if elapsed else 0:,.0f} msg/s, "
+          f"{workers or 'no'} workers)")
+    if total:
+        print(f"canonicalize: {canonical_seconds / total * 1e6:.2f} µs/msg (text and bio)")
+    for rp, spent in zip(replayers, stateless_seconds):
+        spent = spent + rp.seconds
+        print(f"\n[{rp.rules.name}] checks: {', '.join(rp.rules.checks) or 'none'}")
+        for check in (*rp.rules.checks, CLEAN):
+            count = rp.verdicts[check]
+            cost = f"  {spent[check] / total * 1e6:6.2f} µs/msg" if total and check in spent else ""
+            print(f"  {check:<10} {count:>10,}  {count / total if total else 0:7.2%}{cost}")
+
+    if len(replayers) == 2:
+        changed = sum(transitions.values())
+        print(f"\nverdict changes {rule_sets[0].name} → {rule_sets[1].name}: {changed:,}")
+        for (before, after), count in transitions.most_common():
+            print(f"  {before:<10} → {after:<10} {count:>10,}")
+        for (chat_id, msg_id, user_id, _, text, _), (before, after) in examples:
+            snippet = text.replace("\n", " ")[:80]
+            print(f"  chat {chat_id} msg {msg_id} user {user_id}: {before} → {after}  {snippet!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("corpus", help="Telegram chat export (result.json) or JSONL file")
+    parser.add_argument("--format", choices=("export", "jsonl"), help="default: by file extension")
+    parser.add_argument("--rules", help="rule file for the baseline (default: bot defaults)")
+    parser.add_argument("--against", help="second rule file; report messages whose verdict differs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="0 runs inline")
+    parser.add_argument("--show", type=int, default=20, help="changed messages to print")
+    args = parser.parse_args()
+
+    fmt = args.format or ("jsonl" if args.corpus.endswith((".jsonl", ".ndjson")) else "export")
+    rule_sets = [load_rules(args.rules)]
+    if args.against:
+        rule_sets.append(load_rules(args.against))
+    replay(args.corpus, fmt, rule_sets, max(0, args.workers), args.show)
+
+
+if __name__ == "__main__":
+    main()
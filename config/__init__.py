@@ -13,10 +13,79 @@ MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB = os.getenv("MONGO_DB", "oxygen")
 OWNER_ID = int(os.getenv("OWNER_ID", "0"))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+# Share of DEBUG records kept per logger, e.g. "handlers.general=0.01,handlers.filters=0.1"
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+LOOP_LAG_THRESHOLD_MS = int(os.getenv("LOOP_LAG_THRESHOLD_MS", "500"))  # 0 disables the loop watchdog
+SESSION_STORAGE = os.getenv("SESSION_STORAGE", "file").lower()  # "file" or "mongo"
+STATS_TOKEN = os.getenv("STATS_TOKEN", "")  # required by the web /stats endpoint when set
 LOG_GROUP_ID = int(os.getenv("LOG_GROUP_ID", "0"))
+LOG_DIGEST_INTERVAL = int(os.getenv("LOG_DIGEST_INTERVAL", "60"))  # seconds, 0 sends every event at once
 SUPPORT_CHAT_URL = os.getenv("SUPPORT_CHAT_URL", "https://t.me/BotzEmpire")
 DEVELOPER_URL = os.getenv("DEVELOPER_URL", "https://t.me/btw_deva")
 PANEL_IMAGE_URL = os.getenv("PANEL_IMAGE_URL", "https://files.catbox.moe/uvqeln.jpg")
+SPAM_CHAT_THRESHOLD = int(os.getenv("SPAM_CHAT_THRESHOLD", "3"))  # 0 disables cross-chat spam detection
+SPAM_WINDOW = int(os.getenv("SPAM_WINDOW", "600"))
+RAID_JOIN_THRESHOLD = int(os.getenv("RAID_JOIN_THRESHOLD", "30"))  # joins per RAID_WINDOW, 0 disables
+RAID_WINDOW = int(os.getenv("RAID_WINDOW", "60"))
+RAID_LOCK_SECONDS = int(os.getenv("RAID_LOCK_SECONDS", "900"))
+# Comma-separated domain rules applied in every chat, e.g. "example.com,*.cdn.net,t.me/mychannel"
+ALLOWED_DOMAINS = [d.strip() for d in os.getenv("ALLOWED_DOMAINS", "").split(",") if d.strip()]
+BLOCKED_DOMAINS = [d.strip() for d in os.getenv("BLOCKED_DOMAINS", "").split(",") if d.strip()]
+
+# ───── Runtime profile: concurrency, pool sizes and in-memory bounds ─────
+# Pick a preset with RUNTIME_PROFILE and override any single value by env var.
+RUNTIME_PROFILES = {
+    "small": {
+        "BOT_WORKERS": 4,
+        "USE_UVLOOP": False,
+        "MONGO_MAX_POOL_SIZE": 10,
+        "MONGO_MIN_POOL_SIZE": 0,
+        "FLOOD_MAX_TRACKED": 20_000,
+        "SPAM_MAX_FINGERPRINTS": 10_000,
+        "AUDIT_QUEUE_SIZE": 2_000,
+        "DB_JOURNAL_SIZE": 1_000,
+        "DB_READ_CACHE_SIZE": 20_000,
+    },
+    "medium": {
+        "BOT_WORKERS": 16,
+        "USE_UVLOOP": False,
+        "MONGO_MAX_POOL_SIZE": 50,
+        "MONGO_MIN_POOL_SIZE": 5,
+        "FLOOD_MAX_TRACKED": 100_000,
+        "SPAM_MAX_FINGERPRINTS": 50_000,
+        "AUDIT_QUEUE_SIZE": 10_000,
+        "DB_JOURNAL_SIZE": 5_000,
+        "DB_READ_CACHE_SIZE": 100_000,
+    },
+    "large": {
+        "BOT_WORKERS": 64,
+        "USE_UVLOOP": True,
+        "MONGO_MAX_POOL_SIZE": 200,
+        "MONGO_MIN_POOL_SIZE": 20,
+        "FLOOD_MAX_TRACKED": 500_000,
+        "SPAM_MAX_FINGERPRINTS": 200_000,
+        "AUDIT_QUEUE_SIZE": 50_000,
+        "DB_JOURNAL_SIZE": 20_000,
+        "DB_READ_CACHE_SIZE": 500_000,
+    },
+}
+RUNTIME_PROFILE = os.getenv("RUNTIME_PROFILE", "medium").lower()
+if RUNTIME_PROFILE not in RUNTIME_PROFILES:
+    raise RuntimeError(
+        f"Invalid RUNTIME_PROFILE {RUNTIME_PROFILE!r}. Use one of: {', '.join(RUNTIME_PROFILES)}"
+    )
+_profile = RUNTIME_PROFILES[RUNTIME_PROFILE]
+
+BOT_WORKERS = int(os.getenv("BOT_WORKERS", _profile["BOT_WORKERS"]))
+USE_UVLOOP = os.getenv("USE_UVLOOP", str(_profile["USE_UVLOOP"])).lower() in {"1", "true", "yes", "on"}
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", _profile["MONGO_MAX_POOL_SIZE"]))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", _profile["MONGO_MIN_POOL_SIZE"]))
+FLOOD_MAX_TRACKED = int(os.getenv("FLOOD_MAX_TRACKED", _profile["FLOOD_MAX_TRACKED"]))
+SPAM_MAX_FINGERPRINTS = int(os.getenv("SPAM_MAX_FINGERPRINTS", _profile["SPAM_MAX_FINGERPRINTS"]))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", _profile["AUDIT_QUEUE_SIZE"]))
+DB_JOURNAL_SIZE = int(os.getenv("DB_JOURNAL_SIZE", _profile["DB_JOURNAL_SIZE"]))
+DB_READ_CACHE_SIZE = int(os.getenv("DB_READ_CACHE_SIZE", _profile["DB_READ_CACHE_SIZE"]))
 
 _missing = [name for name, val in {"BOT_TOKEN": BOT_TOKEN, "API_ID": API_ID, "API_HASH": API_HASH}.items() if not val]
 if _missing:
@@ -9,6 +9,9 @@ from . import (
     broadcast,
     general,
     panels,
+    raid,
+    captcha,
+    templates,
 )
 
 MODULES = [
@@ -16,6 +19,9 @@ MODULES = [
     filters,
     logging_handler,  # ⚠️ Must match filename exactly
     broadcast,
+    raid,  # command modules go before general: its fallbacks take every other message in group 0
+    captcha,
+    templates,
     general,
     panels,
 ]
@@ -28,10 +34,10 @@ def register_all(app):
         if hasattr(module, "register"):
             try:
                 module.register(app)
-                logger.info(f"✅ Registered: {module.__name__.split('.')[-1]}.py")
+                logger.info("✅ Registered: %s.py", module.__name__.split(".")[-1])
             except Exception as e:
-                logger.error(f"❌ Failed to register {module.__name__.split('.')[-1]}: {e}")
+                logger.error("❌ Failed to register %s: %s", module.__name__.split(".")[-1], e)
         else:
-            logger.warning(f"⚠️ Skipped: {module.__name__.split('.')[-1]}.py — no register() function")
+            logger.warning("⚠️ Skipped: %s.py — no register() function", module.__name__.split(".")[-1])
 
     logger.info("✅ All modules registered.")
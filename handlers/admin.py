@@ -1,17 +1,35 @@
+import asyncio
 import logging
+import time
+from contextlib import suppress
+from html import escape
 from pyrogram import Client, filters
+from pyrogram.errors import FloodWait, ChatAdminRequired
 from pyrogram.types import Message, ChatPermissions
 from pyrogram.enums import ParseMode, ChatType, ChatMemberStatus
 
 from utils.errors import catch_errors
+from utils import audit
 from utils.db import (
-    approve_user, unapprove_user, get_approved,
+    approve_user, unapprove_user,
     increment_warning, reset_warning, set_setting,
     set_bio_filter, toggle_approval_mode, set_approval_mode,
+    add_blacklist_word, remove_blacklist_word, get_blacklist,
+    set_domain_rule, remove_domain_rule, get_domain_rules,
+    get_audit_events, set_warn_expiry,
 )
+from handlers.filters import invalidate_blacklist, invalidate_domain_policy
+from handlers.panels import build_approved_page
+from utils.domains import split_rule
+from utils.perms import bot_can, lost_bot_right, missing_right_text, CAN_DELETE, CAN_RESTRICT
 
 logger = logging.getLogger(__name__)
 
+PURGE_CHUNK = 100  # delete_messages accepts at most 100 ids per call
+PURGE_DELAY = 0.5  # seconds between chunks to stay under rate limits
+PURGE_PROGRESS_EVERY = 3  # seconds between progress edits
+PURGE_MAX_SPAN = 5000  # most message ids a single /purge may cover
+
 
 def register(app: Client) -> None:
     logger.info("✅ Registered: admin.py")
@@ -33,6 +51,12 @@ def register(app: Client) -> None:
             return False
         return True
 
+    async def _require_bot_right(message: Message, right: str) -> bool:
+        if await bot_can(app, message.chat.id, right):
+            return True
+        await message.reply_text(missing_right_text(right), parse_mode=ParseMode.HTML)
+        return False
+
     # Central admin action executor
     async def _admin_action(message: Message, action: str) -> None:
         if not await _require_admin_group(app, message):
@@ -42,6 +66,8 @@ def register(app: Client) -> None:
         if not user:
             await message.reply_text("📌 Reply to a user's message.")
             return
+        if not await _require_bot_right(message, CAN_RESTRICT):
+            return
 
         try:
             if action == "ban":
@@ -66,7 +92,11 @@ def register(app: Client) -> None:
                         can_invite_users=True,
                     ),
                 )
+            audit.record(action, message.chat.id, user.id, actor_id=message.from_user.id)
             await message.reply_text(f"{action.title()} successful ✅")
+        except ChatAdminRequired:
+            lost_bot_right(message.chat.id, CAN_RESTRICT)
+            await message.reply_text(missing_right_text(CAN_RESTRICT), parse_mode=ParseMode.HTML)
         except Exception as exc:
             logger.error("%s failed: %s", action, exc)
             await message.reply_text(f"❌ Failed to {action}: {exc}")
@@ -97,6 +127,93 @@ def register(app: Client) -> None:
     async def unmute_cmd(_, message: Message):
         await _admin_action(message, "unmute")
 
+    # Bulk purge
+    async def _delete_chunk(chat_id: int, ids: list[int]) -> int:
+        for _ in range(2):
+            try:
+                return await app.delete_messages(chat_id, ids) or 0
+            except FloodWait as e:
+                logger.warning("⏳ FloodWait during purge in %s: %s sec", chat_id, e.value)
+                await asyncio.sleep(e.value)
+            except Exception as e:
+                logger.warning("Purge chunk failed in %s: %s", chat_id, e)
+                return 0
+        return 0
+
+    async def _sent_by(chat_id: int, ids: list[int], user_id: int) -> list[int]:
+        for _ in range(2):
+            try:
+                msgs = await app.get_messages(chat_id, ids)
+            except FloodWait as e:
+                logger.warning("⏳ FloodWait during purge in %s: %s sec", chat_id, e.value)
+                await asyncio.sleep(e.value)
+                continue
+            except Exception as e:
+                logger.warning("Purge lookup failed in %s: %s", chat_id, e)
+                return []
+            return [m.id for m in msgs if m and not m.empty and m.from_user and m.from_user.id == user_id]
+        return []
+
+    @app.on_message(filters.command("purge") & filters.group)
+    @catch_errors
+    async def purge_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        reply = message.reply_to_message
+        if not reply:
+            await message.reply_text(
+                "📌 Reply to the first message to purge. Add <code>user</code> to only purge that sender."
+            )
+            return
+
+        only_user = None
+        if len(message.command) > 1 and message.command[1].lower() in {"user", "sender"}:
+            if not reply.from_user:
+                await message.reply_text("❗ Could not determine the sender of that message.")
+                return
+            only_user = reply.from_user.id
+        if not await _require_bot_right(message, CAN_DELETE):
+            return
+
+        chat_id = message.chat.id
+        ids = range(reply.id, message.id + 1)
+        if len(ids) > PURGE_MAX_SPAN:
+            await message.reply_text(
+                f"❗ That covers {len(ids):,} messages; /purge handles at most {PURGE_MAX_SPAN:,} at a time. "
+                "Reply to a newer message."
+            )
+            return
+        status = await message.reply_text(f"🧹 Purging {len(ids)} messages…")
+        deleted = 0
+        last_report = time.monotonic()
+
+        try:
+            for offset in range(0, len(ids), PURGE_CHUNK):
+                chunk = list(ids[offset:offset + PURGE_CHUNK])
+                if only_user:
+                    chunk = await _sent_by(chat_id, chunk, only_user)
+                if chunk:
+                    deleted += await _delete_chunk(chat_id, chunk)
+
+                now = time.monotonic()
+                if now - last_report >= PURGE_PROGRESS_EVERY:
+                    last_report = now
+                    with suppress(Exception):
+                        await status.edit_text(f"🧹 Purging… {min(offset + PURGE_CHUNK, len(ids))}/{len(ids)} scanned, {deleted} deleted")
+                await asyncio.sleep(PURGE_DELAY)
+        except Exception:
+            with suppress(Exception):
+                await status.edit_text(f"❗ Purge stopped: {deleted} messages deleted")
+            raise
+
+        logger.info("[ADMIN] Purged %d messages in %s", deleted, chat_id)
+        audit.record(
+            "purge", chat_id, only_user, actor_id=message.from_user.id,
+            reason=f"{deleted} messages from {reply.id} to {message.id}",
+        )
+        with suppress(Exception):
+            await status.edit_text(f"✅ Purge complete: {deleted} messages deleted")
+
     @app.on_message(filters.command("warn") & filters.group)
     @catch_errors
     async def warn_cmd(_, message: Message):
@@ -107,14 +224,33 @@ def register(app: Client) -> None:
             await message.reply_text("📌 Reply to a user's message.")
             return
 
-        count = await increment_warning(message.chat.id, user.id)
-        if count >= 3:
+        # Without the right to mute, reaching the limit must not reset the count and start over
+        can_mute = await bot_can(app, message.chat.id, CAN_RESTRICT)
+        count = await increment_warning(message.chat.id, user.id, limit=3 if can_mute else None)
+        audit.record("warn", message.chat.id, user.id, actor_id=message.from_user.id, reason=f"{count}/3")
+        if count >= 3 and await _require_bot_right(message, CAN_RESTRICT):
             await app.restrict_chat_member(message.chat.id, user.id, ChatPermissions())
-            await reset_warning(message.chat.id, user.id)
+            audit.record("mute", message.chat.id, user.id, actor_id=message.from_user.id, reason="3 warnings")
             await message.reply_text(f"🔇 {user.mention} muted (3 warnings)")
         else:
             await message.reply_text(f"⚠ Warned {user.mention} ({count}/3)")
 
+    @app.on_message(filters.command("warnexpiry") & filters.group)
+    @catch_errors
+    async def warnexpiry_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        try:
+            days = int(message.command[1])
+            if days < 0:
+                raise ValueError
+        except (IndexError, ValueError):
+            await message.reply_text("Usage: /warnexpiry <days> (0 = never expire)")
+            return
+        await set_warn_expiry(message.chat.id, days * 24 * 3600)
+        msg = f"⏳ Warnings now expire after {days} day(s)" if days else "⏳ Warnings never expire"
+        await message.reply_text(msg)
+
     @app.on_message(filters.command(["resetwarn", "rmwarn"]) & filters.group)
     @catch_errors
     async def resetwarn_cmd(_, message: Message):
@@ -125,8 +261,31 @@ def register(app: Client) -> None:
             await message.reply_text("📌 Reply to a user's message.")
             return
         await reset_warning(message.chat.id, user.id)
+        audit.record("resetwarn", message.chat.id, user.id, actor_id=message.from_user.id)
         await message.reply_text(f"🧹 Warnings reset for {user.mention}")
 
+    # Moderation history
+    @app.on_message(filters.command(["modlog", "history"]) & filters.group)
+    @catch_errors
+    async def modlog_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        user = message.reply_to_message.from_user if message.reply_to_message else None
+        events = await get_audit_events(message.chat.id, user.id if user else None, limit=15)
+        if not events:
+            await message.reply_text("No moderation history.")
+            return
+        title = f"<b>History for <code>{user.id}</code>:</b>" if user else "<b>Recent moderation actions:</b>"
+        lines = [title]
+        for ev in events:
+            line = f"• {ev['ts']:%Y-%m-%d %H:%M} <b>{ev['action']}</b>"
+            if not user and ev.get("user_id"):
+                line += f" <code>{ev['user_id']}</code>"
+            if ev.get("reason"):
+                line += f" — {escape(ev['reason'])}"
+            lines.append(line)
+        await message.reply_text("\n".join(lines), parse_mode=ParseMode.HTML)
+
     # Filter toggles
     async def _toggle_setting_cmd(message: Message, key: str, label: str):
         if len(message.command) < 2:
@@ -157,6 +316,37 @@ def register(app: Client) -> None:
     async def editfilter_cmd(_, message: Message):
         await _toggle_setting_cmd(message, "editmode", "✏️ Edit filter")
 
+    @app.on_message(filters.command("antiflood") & filters.group)
+    @catch_errors
+    async def antiflood_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        await _toggle_setting_cmd(message, "floodmode", "🌊 Anti-flood")
+
+    @app.on_message(filters.command("spamshield") & filters.group)
+    @catch_errors
+    async def spamshield_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        await _toggle_setting_cmd(message, "spamshield", "🛰 Spam shield")
+
+    @app.on_message(filters.command("setflood") & filters.group)
+    @catch_errors
+    async def setflood_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        try:
+            limit = int(message.command[1])
+            window = int(message.command[2]) if len(message.command) > 2 else 10
+            if limit < 1 or window < 1:
+                raise ValueError
+        except (IndexError, ValueError):
+            await message.reply_text("Usage: /setflood <count> [seconds]")
+            return
+        await set_setting(message.chat.id, "flood_limit", str(limit))
+        await set_setting(message.chat.id, "flood_window", str(window))
+        await message.reply_text(f"🌊 Flood limit set to {limit} messages per {window}s")
+
     @app.on_message(filters.command("setautodelete") & filters.group)
     @catch_errors
     async def setautodelete_cmd(_, message: Message):
@@ -170,6 +360,102 @@ def register(app: Client) -> None:
         except ValueError:
             await message.reply_text("❗ Provide a valid number of seconds.")
 
+    # Keyword blacklist
+    @app.on_message(filters.command(["addblacklist", "blacklistadd"]) & filters.group)
+    @catch_errors
+    async def addblacklist_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        if len(message.command) < 2:
+            await message.reply_text("Usage: /addblacklist <word or phrase>")
+            return
+        word = message.text.split(None, 1)[1].strip().casefold()
+        await add_blacklist_word(message.chat.id, word)
+        invalidate_blacklist(message.chat.id)
+        await message.reply_text(f"🚫 Blacklisted: <code>{escape(word)}</code>", parse_mode=ParseMode.HTML)
+
+    @app.on_message(filters.command(["rmblacklist", "unblacklist"]) & filters.group)
+    @catch_errors
+    async def rmblacklist_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        if len(message.command) < 2:
+            await message.reply_text("Usage: /rmblacklist <word or phrase>")
+            return
+        word = message.text.split(None, 1)[1].strip().casefold()
+        if await remove_blacklist_word(message.chat.id, word):
+            invalidate_blacklist(message.chat.id)
+            await message.reply_text(f"✅ Removed <code>{escape(word)}</code> from blacklist", parse_mode=ParseMode.HTML)
+        else:
+            await message.reply_text("❗ That word is not blacklisted.")
+
+    @app.on_message(filters.command("blacklist") & filters.group)
+    @catch_errors
+    async def blacklist_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        words = await get_blacklist(message.chat.id)
+        if not words:
+            await message.reply_text("No blacklisted words.")
+        else:
+            words.sort()
+            text = "<b>Blacklisted Words:</b>\n" + "\n".join(f"• <code>{escape(w)}</code>" for w in words[:100])
+            if len(words) > 100:
+                text += f"\n… and {len(words) - 100} more"
+            await message.reply_text(text, parse_mode=ParseMode.HTML)
+
+    # Domain allow/block lists for LinkFilter
+    async def _domain_rule_cmd(message: Message, mode: str | None):
+        if not await _require_admin_group(app, message):
+            return
+        if len(message.command) < 2:
+            await message.reply_text(f"Usage: /{message.command[0]} <domain>")
+            return
+        host, path = split_rule(message.command[1])
+        if not host:
+            await message.reply_text("❗ Provide a valid domain.")
+            return
+        domain = f"{host}/{path}" if path else host
+        if mode is None:
+            removed = await remove_domain_rule(message.chat.id, domain)
+            text = f"🗑 Removed rule for <code>{escape(domain)}</code>" if removed else "❗ No rule for that domain."
+        else:
+            await set_domain_rule(message.chat.id, domain, mode)
+            text = f"{'✅ Allowed' if mode == 'allow' else '⛔ Blocked'} <code>{escape(domain)}</code>"
+        invalidate_domain_policy(message.chat.id)
+        await message.reply_text(text, parse_mode=ParseMode.HTML)
+
+    @app.on_message(filters.command("allowdomain") & filters.group)
+    @catch_errors
+    async def allowdomain_cmd(_, message: Message):
+        await _domain_rule_cmd(message, "allow")
+
+    @app.on_message(filters.command("blockdomain") & filters.group)
+    @catch_errors
+    async def blockdomain_cmd(_, message: Message):
+        await _domain_rule_cmd(message, "block")
+
+    @app.on_message(filters.command(["rmdomain", "unallowdomain", "unblockdomain"]) & filters.group)
+    @catch_errors
+    async def rmdomain_cmd(_, message: Message):
+        await _domain_rule_cmd(message, None)
+
+    @app.on_message(filters.command("domains") & filters.group)
+    @catch_errors
+    async def domains_cmd(_, message: Message):
+        if not await _require_admin_group(app, message):
+            return
+        rules = await get_domain_rules(message.chat.id)
+        if not rules["allow"] and not rules["block"]:
+            await message.reply_text("No domain rules. Use /allowdomain or /blockdomain.")
+            return
+        lines = []
+        for mode, label in (("allow", "✅ <b>Allowed</b>"), ("block", "⛔ <b>Blocked</b>")):
+            if rules[mode]:
+                lines.append(label)
+                lines.extend(f"• <code>{escape(d)}</code>" for d in sorted(rules[mode])[:50])
+        await message.reply_text("\n".join(lines), parse_mode=ParseMode.HTML)
+
     # Approval system
     @app.on_message(filters.command("approve") & filters.group)
     @catch_errors
@@ -200,12 +486,8 @@ def register(app: Client) -> None:
     async def approved_cmd(_, message: Message):
         if not await _require_admin_group(app, message):
             return
-        users = await get_approved(message.chat.id)
-        if not users:
-            await message.reply_text("No approved users.")
-        else:
-            text = "<b>Approved Users:</b>\n" + "\n".join(f"• <code>{uid}</code>" for uid in users)
-            await message.reply_text(text, parse_mode=ParseMode.HTML)
+        text, markup = await build_approved_page(message.chat.id)
+        await message.reply_text(text, reply_markup=markup, parse_mode=ParseMode.HTML)
 
     @app.on_message(filters.command("approval") & filters.group)
     @catch_errors
@@ -1,4 +1,5 @@
 import asyncio
+import io
 import logging
 from pyrogram import Client, filters
 from pyrogram.enums import ParseMode
@@ -12,11 +13,17 @@ from config import OWNER_ID
 from utils.db import (
     get_broadcast_groups,
     get_broadcast_users,
+    get_stats,
+    OUTAGE_ERRORS,
 )
 from utils.errors import catch_errors
+from utils import profiler
 
 logger = logging.getLogger(__name__)
 
+PROFILE_DEFAULT_SECONDS = 30
+PROFILE_MAX_SECONDS = 300
+
 
 def register(app: Client) -> None:
     logger.info("✅ Registered: broadcast.py")
@@ -86,3 +93,66 @@ def register(app: Client) -> None:
             f"Sent: <b>{sent}</b>\nFailed: <b>{failed}</b>",
             parse_mode=ParseMode.HTML
         )
+
+    @app.on_message(filters.command("profile") & filters.user(OWNER_ID))
+    @catch_errors
+    async def profile_cmd(client: Client, message: Message) -> None:
+        """Sample the bot for N seconds and reply with a summary and a flame graph file."""
+        try:
+            seconds = int(message.command[1]) if len(message.command) > 1 else PROFILE_DEFAULT_SECONDS
+            top = int(message.command[2]) if len(message.command) > 2 else 10
+        except ValueError:
+            await message.reply_text("❗ Usage: /profile [seconds] [top]")
+            return
+        seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+
+        if not profiler.supported():
+            await message.reply_text("❗ Profiling needs SIGPROF, which this platform lacks.")
+            return
+        if not profiler.start():
+            await message.reply_text("⏳ A profiling session is already running.")
+            return
+        logger.info("[PROFILE] Started for %ss by %s", seconds, message.from_user.id)
+        await message.reply_text(f"🔬 Profiling for {seconds}s…")
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            report = profiler.stop()
+
+        await message.reply_text(profiler.summary(report, top), parse_mode=ParseMode.HTML)
+        if report.samples:
+            data = io.BytesIO(profiler.collapsed(report).encode("utf-8"))
+            data.name = f"profile-{int(report.duration)}s.folded"
+            await message.reply_document(
+                data,
+                caption="Collapsed stacks — open with speedscope.app or flamegraph.pl",
+            )
+
+    @app.on_message(filters.command("stats") & filters.user(OWNER_ID))
+    @catch_errors
+    async def stats_cmd(client: Client, message: Message) -> None:
+        """Show user/group totals and moderation counters without scanning collections."""
+        try:
+            stats = await get_stats()
+        except OUTAGE_ERRORS:
+            await message.reply_text("❗ MongoDB is unavailable right now.")
+            return
+        totals = stats["totals"]
+        lines = [
+            "📈 <b>Stats</b>",
+            f"👤 Users: <b>{stats['users']:,}</b>",
+            f"👥 Groups: <b>{stats['groups']:,}</b> ({stats['active_chats']:,} active in 24h)",
+            f"✅ Approved users: {stats['approved']:,}",
+            f"📜 Audit events kept: {stats['audit_events']:,}",
+            "",
+            "<b>Moderation</b>",
+            f"🚫 Violations: {totals.get('violations', 0):,} · ⚠️ Warnings: {totals.get('warnings', 0):,}",
+            f"🔇 Mutes: {totals.get('mutes', 0):,} · 👢 Kicks: {totals.get('kicks', 0):,} · "
+            f"⛔ Bans: {totals.get('bans', 0):,}",
+        ]
+        if stats["top_chats"]:
+            lines.append("\n<b>Most violations</b>")
+            lines.extend(
+                f"• <code>{chat['chat_id']}</code> — {chat['violations']:,}" for chat in stats["top_chats"]
+            )
+        await message.reply_text("\n".join(lines), parse_mode=ParseMode.HTML)
@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from pyrogram import Client, filters
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.errors import ChatAdminRequired
+from pyrogram.types import (
+    Message,
+    CallbackQuery,
+    ChatMemberUpdated,
+    ChatPermissions,
+    InlineKeyboardMarkup,
+    InlineKeyboardButton,
+)
+
+from utils.errors import catch_errors
+from utils.db import (
+    is_approved,
+    set_setting,
+    add_captcha_pending,
+    remove_captcha_pending,
+    get_captcha_pending,
+    OUTAGE_ERRORS,
+)
+from utils.perms import is_admin, bot_can, lost_bot_right, notify_missing_right, CAN_RESTRICT, CAN_DELETE
+from utils.timewheel import TimingWheel
+from utils import audit
+from handlers.filters import get_plan
+from handlers.raid import lockdown_until
+
+logger = logging.getLogger(__name__)
+
+CAPTCHA_TICK = 1.0  # seconds between expiry sweeps
+CAPTCHA_CALLBACK = "captcha_ok"
+PROMPT_REUSE = 30  # seconds joiners keep sharing the chat's latest prompt
+KICK_BATCH = 50  # expired users handled per batch
+KICK_CONCURRENCY = 5
+KICK_BAN_SECONDS = 60  # short ban Telegram lifts itself, so a kick is a single call
+
+MUTED = ChatPermissions(can_send_messages=False)
+UNMUTED = ChatPermissions(
+    can_send_messages=True,
+    can_send_media_messages=True,
+    can_send_polls=True,
+    can_send_other_messages=True,
+    can_add_web_page_previews=True,
+    can_invite_users=True,
+)
+
+# Pending verifications: one wheel for every chat, keyed by (chat_id, user_id)
+_wheel = TimingWheel(tick=CAPTCHA_TICK, slots=512)
+_prompt_of: dict[tuple[int, int], int] = {}  # (chat_id, user_id) -> prompt message id
+_prompt_refs: dict[tuple[int, int], int] = {}  # (chat_id, message id) -> users still pending on it
+_latest_prompt: dict[int, tuple[int, float]] = {}  # chat_id -> (message id, sent at)
+_task: asyncio.Task | None = None
+
+
+def _track(chat_id: int, user_id: int, deadline: float, prompt_id: int) -> None:
+    _wheel.add((chat_id, user_id), deadline)
+    _prompt_of[(chat_id, user_id)] = prompt_id
+    _prompt_refs[(chat_id, prompt_id)] = _prompt_refs.get((chat_id, prompt_id), 0) + 1
+
+
+def _release(chat_id: int, user_id: int) -> int | None:
+    """Drop a pending user; returns their prompt id if nobody else is waiting on it."""
+    _wheel.remove((chat_id, user_id))
+    prompt_id = _prompt_of.pop((chat_id, user_id), None)
+    if prompt_id is None:
+        return None
+    refs = _prompt_refs.get((chat_id, prompt_id), 1) - 1
+    if refs > 0:
+        _prompt_refs[(chat_id, prompt_id)] = refs
+        return None
+    _prompt_refs.pop((chat_id, prompt_id), None)
+    if _latest_prompt.get(chat_id, (None,))[0] == prompt_id:
+        del _latest_prompt[chat_id]
+    return prompt_id
+
+
+async def _challenge(client: Client, chat_id: int, users: list, timeout: int) -> None:
+    users = [u for u in users if not u.is_bot and (chat_id, u.id) not in _wheel]
+    if not users:
+        return
+    if not await bot_can(client, chat_id, CAN_RESTRICT):
+        await notify_missing_right(client, chat_id, CAN_RESTRICT)
+        return
+
+    deadline = time.time() + timeout
+    for user in users:
+        _wheel.add((chat_id, user.id), deadline)  # claim first: the join may arrive twice
+
+    challenged = []
+    for user in users:
+        if await is_approved(chat_id, user.id):
+            _wheel.remove((chat_id, user.id))
+            continue
+        try:
+            await client.restrict_chat_member(chat_id, user.id, MUTED)
+            challenged.append(user)
+        except ChatAdminRequired:
+            lost_bot_right(chat_id, CAN_RESTRICT)
+            await notify_missing_right(client, chat_id, CAN_RESTRICT)
+            for pending in users:
+                _wheel.remove((chat_id, pending.id))
+            return
+        except Exception as e:
+            logger.warning("Captcha mute failed for %s in %s: %s", user.id, chat_id, e)
+            _wheel.remove((chat_id, user.id))
+    if not challenged:
+        return
+
+    # Joiners arriving close together share one prompt instead of one message each
+    latest = _latest_prompt.get(chat_id)
+    if latest and time.time() - latest[1] < PROMPT_REUSE:
+        prompt_id = latest[0]
+    else:
+        try:
+            prompt = await client.send_message(
+                chat_id,
+                f"👋 Welcome! New members must tap the button below within {timeout} seconds "
+                "to show they are human, or they will be removed.",
+                reply_markup=InlineKeyboardMarkup(
+                    [[InlineKeyboardButton("✅ I'm human", callback_data=CAPTCHA_CALLBACK)]]
+                ),
+            )
+        except Exception as e:
+            logger.warning("Could not send captcha prompt in %s: %s", chat_id, e)
+            # Without a button they could never verify, so give their voice back
+            for user in challenged:
+                _wheel.remove((chat_id, user.id))
+                await _unmute(client, chat_id, user.id)
+            return
+        prompt_id = prompt.id
+        _latest_prompt[chat_id] = (prompt_id, time.time())
+
+    for user in challenged:
+        _track(chat_id, user.id, deadline, prompt_id)
+        await add_captcha_pending(chat_id, user.id, deadline, prompt_id)
+    logger.debug("[CAPTCHA] %d users pending in %s", len(challenged), chat_id)
+
+
+async def _unmute(client: Client, chat_id: int, user_id: int) -> float:
+    """Lift the captcha mute; returns when a raid lockdown ends if it keeps them muted, else 0."""
+    until = lockdown_until(chat_id)
+    try:
+        if until:
+            # Keep the raid lockdown's mute, but let it expire with the lockdown
+            await client.restrict_chat_member(
+                chat_id, user_id, MUTED, until_date=datetime.fromtimestamp(until)
+            )
+        else:
+            await client.restrict_chat_member(chat_id, user_id, UNMUTED)
+    except Exception as e:
+        logger.warning("Captcha unmute failed for %s in %s: %s", user_id, chat_id, e)
+    return until
+
+
+async def verify_captcha(client: Client, query: CallbackQuery) -> None:
+    """Handle the captcha button; called from the central callback dispatcher."""
+    chat_id = query.message.chat.id
+    user_id = query.from_user.id
+    if (chat_id, user_id) not in _wheel:
+        await query.answer("This button is not for you.", show_alert=False)
+        return
+
+    prompt_id = _release(chat_id, user_id)
+    await remove_captcha_pending([(chat_id, user_id)])
+    until = await _unmute(client, chat_id, user_id)
+    await query.answer(
+        "✅ Verified! You can talk once the raid lockdown ends." if until else "✅ Verified, welcome!"
+    )
+    if prompt_id is not None:
+        try:
+            await client.delete_messages(chat_id, prompt_id)
+        except Exception as e:
+            logger.debug("Could not delete captcha prompt in %s: %s", chat_id, e)
+
+
+async def _kick(client: Client, chat_id: int, user_id: int, limit: asyncio.Semaphore) -> bool:
+    async with limit:
+        try:
+            await client.ban_chat_member(
+                chat_id, user_id, until_date=datetime.fromtimestamp(time.time() + KICK_BAN_SECONDS)
+            )
+            audit.record("kick", chat_id, user_id, reason="captcha timeout")
+            return True
+        except ChatAdminRequired:
+            lost_bot_right(chat_id, CAN_RESTRICT)
+        except Exception as e:
+            logger.warning("Captcha kick failed for %s in %s: %s", user_id, chat_id, e)
+        return False
+
+
+async def _expire(client: Client, expired: list[tuple[int, int]]) -> None:
+    limit = asyncio.Semaphore(KICK_CONCURRENCY)
+    for offset in range(0, len(expired), KICK_BATCH):
+        batch = expired[offset:offset + KICK_BATCH]
+        prompts: dict[int, list[int]] = defaultdict(list)
+        kicks = []
+        for chat_id, user_id in batch:
+            prompt_id = _release(chat_id, user_id)
+            if prompt_id is not None:
+                prompts[chat_id].append(prompt_id)
+            if await bot_can(client, chat_id, CAN_RESTRICT):
+                kicks.append(_kick(client, chat_id, user_id, limit))
+            else:
+                await notify_missing_right(client, chat_id, CAN_RESTRICT)
+        kicked = sum(await asyncio.gather(*kicks))
+        for chat_id, ids in prompts.items():
+            if await bot_can(client, chat_id, CAN_DELETE):
+                try:
+                    await client.delete_messages(chat_id, ids)
+                except Exception as e:
+                    logger.debug("Could not delete captcha prompts in %s: %s", chat_id, e)
+        await remove_captcha_pending(batch)
+        logger.info("[CAPTCHA] Removed %d/%d unverified users", kicked, len(batch))
+
+
+async def _run(client: Client) -> None:
+    try:
+        docs = await get_captcha_pending()
+    except OUTAGE_ERRORS as e:
+        docs = []
+        logger.warning("Could not restore pending captchas: %s", e)
+    except Exception as e:
+        docs = []
+        logger.exception("Restoring pending captchas failed: %s", e)
+    for doc in docs:
+        _track(doc["chat_id"], doc["user_id"], doc["deadline"], doc["message_id"])
+    if docs:
+        logger.info("[CAPTCHA] Restored %d pending verifications", len(docs))
+
+    while True:
+        await asyncio.sleep(CAPTCHA_TICK)
+        try:
+            expired = _wheel.advance()
+            if expired:
+                await _expire(client, expired)
+        except Exception as e:  # keep the sweeper alive
+            logger.exception("Captcha expiry failed: %s", e)
+
+
+def start_captcha(client: Client) -> None:
+    """Restore pending verifications and start the expiry sweeper. Call after ``init_db``."""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_run(client))
+
+
+def register(app: Client) -> None:
+    logger.info("✅ Registered: captcha.py")
+
+    @app.on_message(filters.new_chat_members & filters.group, group=3)
+    @catch_errors
+    async def captcha_on_join(client: Client, message: Message):
+        timeout = (await get_plan(message.chat.id)).captcha_timeout
+        if timeout:
+            await _challenge(client, message.chat.id, message.new_chat_members, timeout)
+
+    @app.on_chat_member_updated(filters.group, group=3)
+    @catch_errors
+    async def captcha_on_member_join(client: Client, update: ChatMemberUpdated):
+        member = update.new_chat_member
+        if not member or not member.user or member.status != ChatMemberStatus.MEMBER:
+            return
+        old = update.old_chat_member
+        if old and old.status not in {ChatMemberStatus.LEFT, ChatMemberStatus.BANNED}:
+            return
+        timeout = (await get_plan(update.chat.id)).captcha_timeout
+        if timeout:
+            await _challenge(client, update.chat.id, [member.user], timeout)
+
+    @app.on_message(filters.command("captcha") & filters.group)
+    @catch_errors
+    async def captcha_cmd(client: Client, message: Message):
+        if not message.from_user or not await is_admin(client, message, message.from_user.id):
+            await message.reply_text("🔒 You must be an admin to use this.")
+            return
+        chat_id = message.chat.id
+        arg = message.command[1].lower() if len(message.command) > 1 else ""
+        if arg in {"on", "off"}:
+            await set_setting(chat_id, "captcha", "1" if arg == "on" else "0")
+            await message.reply_text(f"🧩 Captcha {'enabled' if arg == 'on' else 'disabled'}.")
+        elif arg.isdigit() and 10 <= int(arg) <= 3600:
+            await set_setting(chat_id, "captcha_timeout", arg)
+            await message.reply_text(f"🧩 New members now get {arg} seconds to verify.")
+        else:
+            plan = await get_plan(chat_id)
+            state = f"on ({plan.captcha_timeout}s)" if plan.captcha_timeout else "off"
+            await message.reply_text(f"🧩 Captcha is {state}.\nUsage: /captcha on|off|&lt;seconds 10-3600&gt;")
+
+
+async def stop_captcha() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
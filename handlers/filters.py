@@ -1,31 +1,51 @@
 import asyncio
 import logging
-import re
 import time
-from contextlib import suppress
 
 from pyrogram import Client, filters
-from pyrogram.enums import ParseMode
-from pyrogram.types import Message, ChatPermissions
+from pyrogram.enums import ParseMode, ChatMemberStatus
+from pyrogram.errors import ChatAdminRequired
+from pyrogram.types import Message, ChatPermissions, ChatMemberUpdated
 
 from utils.errors import catch_errors
 from utils.db import (
     get_setting,
-    get_bio_filter,
+    get_settings,
     increment_warning,
-    reset_warning,
     is_approved,
-    get_approval_mode,
+    get_blacklist,
+    get_domain_rules,
+    on_setting_change,
+    OUTAGE_ERRORS,
+)
+from utils.perms import (
+    is_admin,
+    bot_can,
+    lost_bot_right,
+    notify_missing_right,
+    CAN_DELETE,
+    CAN_RESTRICT,
+)
+from utils import audit
+from utils.flood import FloodTracker
+from utils.fingerprint import FingerprintIndex
+from utils.matcher import KeywordMatcher
+from utils.domains import DomainPolicy
+from utils.links import contains_link, has_forbidden_link
+from utils.textnorm import canonicalize
+from utils.plan import ModerationPlan, PLAN_SETTINGS, compile_plan
+from utils.prefetch import PrefetchQueue
+from config import (
+    SPAM_CHAT_THRESHOLD,
+    SPAM_WINDOW,
+    ALLOWED_DOMAINS,
+    BLOCKED_DOMAINS,
+    FLOOD_MAX_TRACKED,
+    SPAM_MAX_FINGERPRINTS,
 )
-from utils.perms import is_admin
 
 logger = logging.getLogger(__name__)
 
-LINK_RE = re.compile(
-    r"(?:https?://\S+|tg://\S+|t\.me/\S+|telegram\.me/\S+|(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,})",
-    re.IGNORECASE,
-)
-
 # Cache user bios to avoid excessive get_chat calls
 _user_bio_cache: dict[int, tuple[str, float]] = {}
 BIO_CACHE_TTL = 15 * 60  # 15 minutes
@@ -33,69 +53,230 @@ BIO_CACHE_TTL = 15 * 60  # 15 minutes
 _bio_violation_cache: dict[tuple[int, int], float] = {}
 BIO_VIOLATION_TTL = 20  # seconds - set low for easier debug
 
-def contains_link(text: str) -> bool:
-    return bool(LINK_RE.search(text or ""))
+# Bios of joining users are fetched in the background so their first message hits a warm cache
+BIO_PREFETCH_CONCURRENCY = 4
+BIO_PREFETCH_RATE = 20  # get_chat calls started per second
+BIO_PREFETCH_MAX_PENDING = 2_000
+BIO_PREFETCH_MAX_AGE = 120  # seconds a queued user stays worth fetching
+_bio_prefetch: PrefetchQueue | None = None  # created in register() once the client exists
+_pending_joins: dict[int, list[Message]] = {}  # user_id -> join messages awaiting the bio verdict
+
+# Anti-flood: per (chat, user) message counters with bounded memory
+_flood_tracker = FloodTracker(buckets=10, max_entries=FLOOD_MAX_TRACKED)
+
+# Cross-chat spam: recent message fingerprints shared by all chats
+_spam_index = FingerprintIndex(window=SPAM_WINDOW, max_entries=SPAM_MAX_FINGERPRINTS)
+
+# Compiled keyword blacklists per chat, dropped whenever the list changes
+_blacklist_cache: dict[int, KeywordMatcher] = {}
+
+# Domain allow/block tries per chat (global rules merged in), rebuilt on change
+_domain_cache: dict[int, DomainPolicy] = {}
+
+# Compiled moderation plans per chat, dropped whenever a setting or rule list changes
+_plan_cache: dict[int, ModerationPlan] = {}
+
+async def get_blacklist_matcher(chat_id: int) -> KeywordMatcher:
+    matcher = _blacklist_cache.get(chat_id)
+    if matcher is None:
+        try:
+            words = await get_blacklist(chat_id)
+        except OUTAGE_ERRORS:
+            return KeywordMatcher(())  # not cached, retried once MongoDB is back
+        # Patterns are folded like message text, so words in any script still match
+        matcher = KeywordMatcher(canonicalize(word) for word in words)
+        _blacklist_cache[chat_id] = matcher
+    return matcher
+
+def message_content(message: Message) -> str:
+    """Canonical text or caption of ``message``, computed once per update."""
+    content = getattr(message, "_canonical", None)
+    if content is None:
+        content = canonicalize(message.text or message.caption or "")
+        message._canonical = content  # underscore attributes stay out of str(message)
+    return content
+
+def invalidate_blacklist(chat_id: int) -> None:
+    _blacklist_cache.pop(chat_id, None)
+    _plan_cache.pop(chat_id, None)
+
+async def get_domain_policy(chat_id: int) -> DomainPolicy:
+    policy = _domain_cache.get(chat_id)
+    if policy is None:
+        try:
+            rules = await get_domain_rules(chat_id)
+        except OUTAGE_ERRORS:
+            return DomainPolicy(ALLOWED_DOMAINS, BLOCKED_DOMAINS)  # not cached
+        policy = DomainPolicy(
+            allow=ALLOWED_DOMAINS + rules["allow"],
+            block=BLOCKED_DOMAINS + rules["block"],
+        )
+        _domain_cache[chat_id] = policy
+    return policy
+
+def invalidate_domain_policy(chat_id: int) -> None:
+    _domain_cache.pop(chat_id, None)
+    _plan_cache.pop(chat_id, None)
+
+def invalidate_plan(chat_id: int) -> None:
+    _plan_cache.pop(chat_id, None)
+
+on_setting_change(invalidate_plan)
+
+async def get_plan(chat_id: int) -> ModerationPlan:
+    plan = _plan_cache.get(chat_id)
+    if plan is not None:
+        return plan
+
+    cacheable = True
+    try:
+        settings = await get_settings(chat_id)
+    except OUTAGE_ERRORS:
+        # Last known values; the plan is rebuilt once MongoDB is back
+        settings = {key: await get_setting(chat_id, key) for key in PLAN_SETTINGS}
+        cacheable = False
+    matcher = await get_blacklist_matcher(chat_id)
+    policy = await get_domain_policy(chat_id)
+    plan = compile_plan(
+        settings,
+        has_blacklist=bool(matcher),
+        has_domain_blocks=bool(policy.block),
+        spam_enabled=SPAM_CHAT_THRESHOLD > 0,
+    )
+    if cacheable and chat_id in _blacklist_cache and chat_id in _domain_cache:
+        _plan_cache[chat_id] = plan
+    return plan
+
+async def _wants_message(_, __, message: Message) -> bool:
+    if not message.from_user or message.from_user.is_bot:
+        return False
+    plan = _plan_cache.get(message.chat.id) or await get_plan(message.chat.id)
+    return plan.wants_message(bool(message.text or message.caption))
 
-async def suppress_delete(message: Message):
-    with suppress(Exception):
+async def _wants_edit(_, __, message: Message) -> bool:
+    if not message.from_user or message.from_user.is_bot:
+        return False
+    plan = _plan_cache.get(message.chat.id) or await get_plan(message.chat.id)
+    return plan.wants_edits
+
+# Pre-dispatch filters: updates from chats whose plan has nothing to do never reach a handler
+moderated = filters.create(_wants_message, "Moderated")
+moderated_edit = filters.create(_wants_edit, "ModeratedEdit")
+
+# suppress_delete outcomes: only a missing right means warning about the message is pointless
+DELETED = "deleted"
+NO_RIGHT = "no_right"
+DELETE_FAILED = "failed"
+
+async def suppress_delete(client: Client, message: Message) -> str:
+    """Delete ``message``; returns DELETED, NO_RIGHT if the bot may not delete, or DELETE_FAILED."""
+    chat_id = message.chat.id
+    if not await bot_can(client, chat_id, CAN_DELETE):
+        await notify_missing_right(client, chat_id, CAN_DELETE)
+        return NO_RIGHT
+    try:
         await message.delete()
+        return DELETED
+    except ChatAdminRequired:
+        lost_bot_right(chat_id, CAN_DELETE)
+        await notify_missing_right(client, chat_id, CAN_DELETE)
+        return NO_RIGHT
+    except Exception as e:
+        logger.debug("Delete failed in %s: %s", chat_id, e)
+    return DELETE_FAILED
 
-def build_warning(count: int, user, reason: str, is_final: bool = False):
+def build_warning(count: int, user, reason: str, is_final: bool = False, can_mute: bool = True):
     name = f"@{user.username}" if user.username else f"{user.first_name} ({user.id})"
-    msg = (
-        f"🔇 <b>Final Warning for {name}</b>\n\n{reason}\nYou have been <b>muted</b>."
-        if is_final
-        else f"⚠️ <b>Warning {count}/3 for {name}</b>\n\n{reason}\nFix this before you're muted."
-    )
+    if is_final:
+        msg = f"🔇 <b>Final Warning for {name}</b>\n\n{reason}\nYou have been <b>muted</b>."
+    elif can_mute:
+        msg = f"⚠️ <b>Warning {count}/3 for {name}</b>\n\n{reason}\nFix this before you're muted."
+    else:
+        msg = f"⚠️ <b>Warning {count} for {name}</b>\n\n{reason}"
     return msg, None
 
 async def handle_violation(client: Client, message: Message, user, chat_id: int, reason: str) -> None:
     logger.debug("[FILTER] Violation by %s in %s: %s", user.id, chat_id, reason)
-    await suppress_delete(message)
-    count = await increment_warning(chat_id, user.id)
-    if count >= 3:
+    # A warning for a message that stays up only adds noise
+    deleted = await suppress_delete(client, message)
+    if deleted == NO_RIGHT:
+        return
+    if deleted == DELETED:
+        audit.record("delete", chat_id, user.id, reason=reason)
+    # Without the right to mute, reaching the limit must not reset the count and start over
+    can_mute = await bot_can(client, chat_id, CAN_RESTRICT)
+    try:
+        count = await increment_warning(chat_id, user.id, limit=3 if can_mute else None)
+    except OUTAGE_ERRORS:
+        count = 1  # database down: still warn, but never escalate to a mute
+    audit.record("warn", chat_id, user.id, reason=f"{reason} ({count}/3)")
+    muted = False
+    if count >= 3 and not can_mute:
+        await notify_missing_right(client, chat_id, CAN_RESTRICT)
+    elif count >= 3:
         try:
             await client.restrict_chat_member(
                 chat_id,
                 user.id,
                 ChatPermissions(can_send_messages=False)
             )
+            audit.record("mute", chat_id, user.id, reason="3 warnings")
+            muted = True
+        except ChatAdminRequired:
+            lost_bot_right(chat_id, CAN_RESTRICT)
+            await notify_missing_right(client, chat_id, CAN_RESTRICT)
+            can_mute = False
         except Exception as e:
             logger.warning("Mute failed: %s", e)
-        await reset_warning(chat_id, user.id)
-    msg, _ = build_warning(count, user, reason, is_final=(count >= 3))
+    msg, _ = build_warning(count, user, reason, is_final=muted, can_mute=can_mute)
     try:
         await message.reply_text(msg, parse_mode=ParseMode.HTML, quote=True)
     except Exception as e:
         logger.warning("Failed to send violation reply: %s", e)
 
-async def get_user_bio(client: Client, user) -> str:
-    now = time.monotonic()
-    cached = _user_bio_cache.get(user.id)
-    if cached and now - cached[1] < BIO_CACHE_TTL:
+def _cached_bio(user_id: int) -> str | None:
+    cached = _user_bio_cache.get(user_id)
+    if cached and time.monotonic() - cached[1] < BIO_CACHE_TTL:
         return cached[0]
+    return None
 
+async def _load_bio(client: Client, user) -> str:
     try:
         chat = await client.get_chat(user.id)
-        bio = getattr(chat, "bio", "") or ""
-        _user_bio_cache[user.id] = (bio, now)
+        bio = canonicalize(getattr(chat, "bio", "") or "")
+        _user_bio_cache[user.id] = (bio, time.monotonic())
         return bio
     except Exception as e:
         logger.warning("Failed to fetch bio for %s: %s", user.id, e)
+        cached = _user_bio_cache.get(user.id)
         return cached[0] if cached else ""
 
-async def bio_link_violation(client: Client, message: Message, user, chat_id: int) -> bool:
-    if not await get_bio_filter(chat_id):
-        logger.debug("Bio link filter OFF for chat %s", chat_id)
-        return False
+async def get_user_bio(client: Client, user) -> str:
+    bio = _cached_bio(user.id)
+    if bio is not None:
+        return bio
+
+    running = _bio_prefetch.running(user.id) if _bio_prefetch else None
+    if running is not None:
+        # Join the prefetch already in flight instead of issuing a second get_chat
+        await asyncio.shield(running)
+        bio = _cached_bio(user.id)
+        if bio is not None:
+            return bio
 
+    return await _load_bio(client, user)
+
+async def bio_link_violation(
+    client: Client, message: Message, user, chat_id: int, bio: str | None = None
+) -> bool:
     now = time.monotonic()
     last = _bio_violation_cache.get((chat_id, user.id), 0)
     if now - last < BIO_VIOLATION_TTL:
         logger.debug("Bio violation check throttled for %s/%s", chat_id, user.id)
         return False
 
-    bio = await get_user_bio(client, user)
+    if bio is None:
+        bio = await get_user_bio(client, user)
     if not bio:
         logger.debug("No bio for user %s in chat %s", user.id, chat_id)
         return False
@@ -116,107 +297,192 @@ async def bio_link_violation(client: Client, message: Message, user, chat_id: in
         logger.debug("User %s bio clean in %s", user.id, chat_id)
         return False
 
+def flood_reason(plan: ModerationPlan, user, chat_id: int) -> str | None:
+    count = _flood_tracker.hit((chat_id, user.id), plan.flood_window)
+    if count <= plan.flood_limit:
+        return None
+
+    logger.info(
+        "[FILTER] Flood detected for %s in %s (%d msgs/%ss)", user.id, chat_id, count, plan.flood_window
+    )
+    # Start a fresh window so one burst yields a single warning
+    _flood_tracker.reset((chat_id, user.id))
+    return f"You are sending messages too fast ({plan.flood_limit} per {plan.flood_window}s allowed)."
+
+def spam_wave_reason(user, chat_id: int, content: str) -> str | None:
+    chats = _spam_index.observe(chat_id, content)
+    if chats <= SPAM_CHAT_THRESHOLD:
+        return None
+
+    logger.info("[FILTER] Spam wave payload from %s in %s (seen in %d chats)", user.id, chat_id, chats)
+    return "This message is being spammed across multiple groups."
+
+async def content_reason(check: str, plan: ModerationPlan, user, chat_id: int, content: str) -> str | None:
+    """Evaluate one plan check that needs no admin/approval lookup; returns the violation reason."""
+    if check == "flood":
+        return flood_reason(plan, user, chat_id)
+    if not content:
+        return None
+    if check == "spam":
+        return spam_wave_reason(user, chat_id, content)
+    if check == "blacklist":
+        word = (await get_blacklist_matcher(chat_id)).search(content)
+        if word:
+            logger.debug("[FILTER] Blacklisted word %r in %s from %s", word, chat_id, user.id)
+            return "Your message contains a blacklisted word."
+    elif check == "links":
+        if has_forbidden_link(content, await get_domain_policy(chat_id), plan.linkfilter):
+            logger.debug("[FILTER] Link removed in %s from %s", chat_id, user.id)
+            return "You are not allowed to share links in this group."
+    return None
+
+def prefetch_bio(user, join_message: Message | None = None) -> bool:
+    """Queue a background bio lookup; with ``join_message`` the bio verdict is applied to it too."""
+    if _bio_prefetch is None or user.is_bot:
+        return False
+    if join_message is not None:
+        # One lookup per user, but every join message (one per chat) gets its verdict
+        joins = _pending_joins.setdefault(user.id, [])
+        if not any(m.chat.id == join_message.chat.id and m.id == join_message.id for m in joins):
+            joins.append(join_message)
+        if len(_pending_joins) > BIO_PREFETCH_MAX_PENDING:
+            del _pending_joins[next(iter(_pending_joins))]
+    if _bio_prefetch.running(user.id) is not None:
+        return False  # the lookup in flight checks the joins queued above before it finishes
+    return _bio_prefetch.submit(user.id, user)
+
+async def stop_bio_prefetch() -> None:
+    if _bio_prefetch is not None:
+        await _bio_prefetch.stop()
+
 def register(app: Client) -> None:
+    global _bio_prefetch
     logger.info("✅ Registered: filters.py")
 
+    async def fetch_bio(_, user) -> None:
+        bio = _cached_bio(user.id)
+        if bio is None:
+            bio = await _load_bio(app, user)
+        # Joins that arrive while the verdicts are applied are picked up by the next pass
+        while joins := _pending_joins.pop(user.id, None):
+            if not bio:
+                continue
+            for join_message in joins:
+                chat_id = join_message.chat.id
+                if await is_admin(app, join_message, user.id) or await is_approved(chat_id, user.id):
+                    continue
+                await bio_link_violation(app, join_message, user, chat_id, bio)
+
+    _bio_prefetch = PrefetchQueue(
+        "bio",
+        fetch_bio,
+        concurrency=BIO_PREFETCH_CONCURRENCY,
+        rate=BIO_PREFETCH_RATE,
+        max_pending=BIO_PREFETCH_MAX_PENDING,
+        max_age=BIO_PREFETCH_MAX_AGE,
+    )
+
     edited_messages: set[tuple[int, int]] = set()
 
     async def delete_later(chat_id: int, msg_id: int, delay: int) -> None:
         await asyncio.sleep(delay)
         try:
+            if not await bot_can(app, chat_id, CAN_DELETE):
+                await notify_missing_right(app, chat_id, CAN_DELETE)
+                return
             await app.delete_messages(chat_id, msg_id)
         except Exception as e:
             logger.warning("Failed to delete message %s/%s: %s", chat_id, msg_id, e)
         finally:
             edited_messages.discard((chat_id, msg_id))
 
-    async def schedule_auto_delete(chat_id: int, msg_id: int, fallback: int | None = None):
-        try:
-            delay = int(await get_setting(chat_id, "autodelete_interval", "0") or 0)
-        except (TypeError, ValueError):
-            delay = 0
-        if delay <= 0:
-            delay = fallback or 0
+    def schedule_auto_delete(chat_id: int, msg_id: int, delay: int) -> None:
         if delay > 0:
             asyncio.create_task(delete_later(chat_id, msg_id, delay))
 
-    @app.on_message(filters.group & ~filters.service, group=1)
+    @app.on_message(filters.group & ~filters.service & moderated, group=1)
     @catch_errors
     async def moderate_message(client: Client, message: Message) -> None:
-        if not message.from_user or message.from_user.is_bot:
-            return
-        if (await client.get_me()).id == message.from_user.id:
-            return
-
         chat_id = message.chat.id
         user = message.from_user
-
-        is_admin_user = await is_admin(client, message, user.id)
-        is_approved_user = await is_approved(chat_id, user.id)
-        needs_filtering = not is_admin_user and not is_approved_user
-
-        if needs_filtering and await bio_link_violation(client, message, user, chat_id):
-            return
-
-        if needs_filtering and await get_approval_mode(chat_id):
-            await suppress_delete(message)
-            await message.reply_text("❌ You are not approved to speak here.", quote=True)
-            return
-
-        content = message.text or message.caption or ""
-        if (
-            content
-            and needs_filtering
-            and str(await get_setting(chat_id, "linkfilter", "0")) == "1"
-            and contains_link(content)
-        ):
-            logger.debug("[FILTER] Link removed in %s from %s", chat_id, user.id)
-            await handle_violation(
-                client,
-                message,
-                user,
-                chat_id,
-                "You are not allowed to share links in this group.",
-            )
-            return
-
-        if needs_filtering:
-            await schedule_auto_delete(chat_id, message.id)
-
-    @app.on_edited_message(filters.group & ~filters.service, group=1)
+        plan = await get_plan(chat_id)
+        content = message_content(message)
+
+        # Admin/approval lookups cost API and DB round trips, so they only run
+        # once a check actually needs them
+        exempt: bool | None = None
+
+        async def is_exempt() -> bool:
+            nonlocal exempt
+            if exempt is None:
+                exempt = await is_admin(client, message, user.id) or await is_approved(chat_id, user.id)
+            return exempt
+
+        for check in plan.checks:
+            if check == "bio":
+                if await is_exempt() or await bio_link_violation(client, message, user, chat_id):
+                    return
+            elif check == "approval":
+                if await is_exempt() or await suppress_delete(client, message) != DELETED:
+                    return
+                audit.record("delete", chat_id, user.id, reason="not approved")
+                await message.reply_text("❌ You are not approved to speak here.", quote=True)
+                return
+            elif check == "flood":
+                # Exempt users must not feed the flood counters
+                if await is_exempt():
+                    return
+                reason = await content_reason(check, plan, user, chat_id, content)
+                if reason:
+                    await handle_violation(client, message, user, chat_id, reason)
+                    return
+            else:
+                if check == "spam" and exempt:
+                    continue  # known exempt already: keep them out of the shared spam index
+                reason = await content_reason(check, plan, user, chat_id, content)
+                if reason:
+                    if not await is_exempt():
+                        await handle_violation(client, message, user, chat_id, reason)
+                    elif check == "spam":
+                        # Exemption is only looked up on a hit, so take the recorded copy back out
+                        _spam_index.forget(chat_id, content)
+                    return
+
+        if plan.autodelete > 0 and not await is_exempt():
+            schedule_auto_delete(chat_id, message.id, plan.autodelete)
+
+    @app.on_edited_message(filters.group & ~filters.service & moderated_edit, group=1)
     @catch_errors
     async def on_edit(client: Client, message: Message):
-        if not message.from_user or message.from_user.is_bot:
-            return
-
         chat_id = message.chat.id
         user = message.from_user
         if await is_admin(client, message, user.id) or await is_approved(chat_id, user.id):
             return
 
-        if str(await get_setting(chat_id, "editmode", "0")) != "1":
-            return
-
         key = (chat_id, message.id)
         if key not in edited_messages:
             edited_messages.add(key)
-            await schedule_auto_delete(chat_id, message.id, fallback=0)
+            schedule_auto_delete(chat_id, message.id, (await get_plan(chat_id)).autodelete)
 
     @app.on_message(filters.new_chat_members & filters.group, group=1)
     @catch_errors
     async def check_new_member_bio(client: Client, message: Message):
-        chat_id = message.chat.id
-        if not await get_bio_filter(chat_id):
+        if "bio" not in (await get_plan(message.chat.id)).checks:
             return
-
         for user in message.new_chat_members:
-            if user.is_bot:
-                continue
-            if await is_admin(client, message, user.id) or await is_approved(chat_id, user.id):
-                continue
-
-            bio = await get_user_bio(client, user)
-            if not bio:
-                continue
+            prefetch_bio(user, message)
 
-            await bio_link_violation(client, message, user, chat_id)
+    @app.on_chat_member_updated(filters.group, group=1)
+    @catch_errors
+    async def prefetch_joined_bio(client: Client, update: ChatMemberUpdated):
+        # Joins via invite links or with hidden service messages only arrive here
+        member = update.new_chat_member
+        if not member or not member.user:
+            return
+        if member.status not in {ChatMemberStatus.MEMBER, ChatMemberStatus.RESTRICTED}:
+            return
+        old = update.old_chat_member
+        if old and old.status not in {ChatMemberStatus.LEFT, ChatMemberStatus.BANNED}:
+            return
+        if "bio" in (await get_plan(update.chat.id)).checks:
+            prefetch_bio(member.user)
@@ -1,11 +1,15 @@
 import logging
 from pyrogram import Client, filters
-from pyrogram.types import Message
+from pyrogram.types import Message, ChatMemberUpdated
 from pyrogram.enums import ParseMode, ChatType
 
 from utils.errors import catch_errors
 from handlers.panels import send_start  # ✅ Panel entry
-from config import LOG_GROUP_ID
+from utils.notifier import notify
+from utils.db import db_status
+from utils.watchdog import lag_stats
+from utils.perms import update_bot_rights
+from utils import stats
 
 logger = logging.getLogger(__name__)
 
@@ -53,13 +57,20 @@ def register(app: Client) -> None:
     @catch_errors
     async def ping_cmd(client: Client, message: Message) -> None:
         logger.info("[GENERAL] /ping in chat %s", message.chat.id)
-        await message.reply_text("🏓 Pong!")
+        db = db_status()
+        text = f"🏓 Pong!\nDB: {db['state']}"
+        if db["state"] != "closed" or db["journal"]:
+            text += f" ({db['failures']} failures, {db['journal']} writes buffered)"
+        lag = lag_stats()
+        if lag["samples"]:
+            text += f"\nLoop lag: p50 {lag['p50']}ms · p99 {lag['p99']}ms · max {lag['max']}ms"
+        await message.reply_text(text)
 
     # ✅ DM fallback (non-command)
     @app.on_message(filters.private & ~filters.command(["start", "help", "menu", "panel", "id", "ping"]))
     @catch_errors
     async def dm_fallback(client: Client, message: Message) -> None:
-        logger.info("[DM FALLBACK] %s: %s", message.from_user.id, message.text)
+        logger.debug("[DM FALLBACK] %s: %s", message.from_user.id if message.from_user else "?", message.text)
         # Do not reply to unknown private messages to avoid spamming users
         return
 
@@ -67,6 +78,9 @@ def register(app: Client) -> None:
     @app.on_message(filters.group & ~filters.command(["start", "help", "menu", "panel", "id", "ping"]) & ~filters.service)
     @catch_errors
     async def group_fallback(client: Client, message: Message) -> None:
+        stats.touch(message.chat.id)  # in-memory; flushed to chat_stats once a minute
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         logger.debug(
             "[GROUP FALLBACK] chat=%s user=%s text=%s",
             message.chat.id,
@@ -84,12 +98,7 @@ def register(app: Client) -> None:
             await add_group(message.chat.id)
             await add_broadcast_group(message.chat.id)
             logger.info("[GENERAL] Bot added to group %s", message.chat.id)
-            if LOG_GROUP_ID:
-                try:
-                    text = f"➕ Bot added to group {message.chat.id}"
-                    await client.send_message(LOG_GROUP_ID, text)
-                except Exception as exc:
-                    logger.warning("Failed to send log: %s", exc)
+            notify(f"➕ Bot added to group <code>{message.chat.id}</code>")
 
     @app.on_message(filters.left_chat_member & filters.group)
     @catch_errors
@@ -100,9 +109,13 @@ def register(app: Client) -> None:
             await remove_group(message.chat.id)
             await remove_broadcast_group(message.chat.id)
             logger.info("[GENERAL] Bot removed from group %s", message.chat.id)
-            if LOG_GROUP_ID:
-                try:
-                    text = f"➖ Bot removed from group {message.chat.id}"
-                    await client.send_message(LOG_GROUP_ID, text)
-                except Exception as exc:
-                    logger.warning("Failed to send log: %s", exc)
+            notify(f"➖ Bot removed from group <code>{message.chat.id}</code>")
+
+    # 🔐 Keep the cached admin rights of the bot in sync (my_chat_member)
+    @app.on_chat_member_updated(filters.group, group=2)
+    @catch_errors
+    async def track_bot_rights(client: Client, update: ChatMemberUpdated):
+        member = update.new_chat_member
+        if member and member.user and member.user.is_self:
+            update_bot_rights(update.chat.id, member)
+            logger.info("[GENERAL] Bot rights updated in %s: %s", update.chat.id, member.status)
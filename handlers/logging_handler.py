@@ -5,10 +5,7 @@ from pyrogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardBu
 
 from config import SUPPORT_CHAT_URL, DEVELOPER_URL
 from utils.errors import catch_errors
-from utils.db import (
-    set_bio_filter, get_bio_filter,
-    get_setting, set_setting
-)
+from utils.db import toggle_setting, toggle_number_setting
 from utils.messages import safe_edit_message
 from utils.perms import is_admin
 from handlers.panels import (
@@ -16,7 +13,9 @@ from handlers.panels import (
     get_help_keyboard,
     build_settings_panel,
     render_settings_panel,
+    build_approved_page,
 )
+from handlers.captcha import verify_captcha, CAPTCHA_CALLBACK
 
 logger = logging.getLogger(__name__)
 
@@ -35,23 +34,43 @@ HELP_SECTIONS = {
     "help_linkfilter": (
         "🔗 <b>LinkFilter</b>\n"
         "Deletes URLs from non-admin messages.\n"
-        "Toggle using <code>/linkfilter on|off</code>."
+        "Toggle using <code>/linkfilter on|off</code>.\n"
+        "Allow or block sites with <code>/allowdomain</code>, <code>/blockdomain</code>, "
+        "<code>/rmdomain</code> and <code>/domains</code> (e.g. <code>*.example.com</code>, <code>t.me/channel</code>)."
     ),
     "help_editmode": (
         "✏️ <b>EditMode</b>\n"
         "Deletes edited messages by normal users.\n"
         "Use <code>/editfilter on|off</code>."
     ),
+    "help_antiflood": (
+        "🌊 <b>AntiFlood</b>\n"
+        "Warns users who send too many messages in a short time.\n"
+        "Use <code>/antiflood on|off</code> and <code>/setflood &lt;count&gt; [seconds]</code>."
+    ),
+    "help_spamshield": (
+        "🛰 <b>SpamShield</b>\n"
+        "Removes near-identical messages once they show up in several groups that use it.\n"
+        "Use <code>/spamshield on|off</code>."
+    ),
     "help_admin": (
         "👮 <b>Admin Commands</b>\n"
         "/ban, /unban - Ban or unban users\n"
         "/kick - Kick users\n"
         "/mute, /unmute - Restrict or allow talking\n"
-        "/warn - issue warning, /rmwarn - clear warnings"
+        "/warn - issue warning, /rmwarn - clear warnings\n"
+        "/warnexpiry &lt;days&gt; - how long warnings count (default 30, 0 = forever)\n"
+        "/modlog - moderation history (reply to a user for theirs)\n"
+        "/purge - delete from the replied message up to now (<code>/purge user</code> for one sender)\n"
+        "/raid on|off - mute new members during a join raid (starts automatically)\n"
+        "/captcha on|off|&lt;seconds&gt; - new members must tap a button or get removed\n"
+        "/addblacklist, /rmblacklist, /blacklist - Manage banned words"
     ),
     "help_broadcast": (
         "📢 <b>Broadcast</b>\n"
-        "Owner-only broadcast to groups via <code>/broadcast</code>."
+        "Owner-only broadcast to groups via <code>/broadcast</code>.\n"
+        "<code>/profile [seconds]</code> samples the bot and sends a flame graph file.\n"
+        "<code>/template</code> saves named settings and applies them to many groups at once."
     ),
 }
 
@@ -66,7 +85,7 @@ def register(app: Client) -> None:
         user_id = query.from_user.id
         chat_id = query.message.chat.id if query.message else "N/A"
 
-        logger.debug(f"[CALLBACK] From user {user_id} in chat {chat_id} → data: {data}")
+        logger.debug("[CALLBACK] From user %s in chat %s → data: %s", user_id, chat_id, data)
 
         if data in {"cb_start", "cb_back_panel"}:
             await query.answer()
@@ -91,6 +110,19 @@ def register(app: Client) -> None:
             else:
                 await query.answer("Admins only", show_alert=True)
 
+        elif data == CAPTCHA_CALLBACK:
+            await verify_captcha(client, query)
+
+        elif data.startswith(("approved_next:", "approved_prev:")):
+            if not await is_admin(client, query.message, user_id):
+                await query.answer("Admins only", show_alert=True)
+                return
+            await query.answer()
+            action, _, cursor = data.partition(":")
+            page_args = {"after": int(cursor)} if action == "approved_next" else {"before": int(cursor)}
+            text, markup = await build_approved_page(query.message.chat.id, **page_args)
+            await safe_edit_message(query.message, text=text, reply_markup=markup, parse_mode=ParseMode.HTML)
+
         elif data in {"cb_help_start", "cb_help_panel"}:
             await query.answer()
             await safe_edit_message(
@@ -143,29 +175,34 @@ def register(app: Client) -> None:
             )
 
         else:
-            logger.warning(f"⚠️ Unknown callback data received: {data}")
+            logger.warning("⚠️ Unknown callback data received: %s", data)
             await query.answer("⚠️ Unknown action", show_alert=True)
 
 
 
 
-# ⚙️ Toggle settings and update DB
+# ⚙️ Toggle settings and update DB (each toggle is one atomic update)
 async def _handle_toggle(data: str, chat_id: int):
     if data == "toggle_biolink":
-        current = await get_bio_filter(chat_id)
-        await set_bio_filter(chat_id, not current)
+        await toggle_setting(chat_id, "biofilter")
 
     elif data == "toggle_linkfilter":
-        current = str(await get_setting(chat_id, "linkfilter", "0")) == "1"
-        await set_setting(chat_id, "linkfilter", "0" if current else "1")
+        await toggle_setting(chat_id, "linkfilter")
 
     elif data == "toggle_editfilter":
-        current = str(await get_setting(chat_id, "editmode", "0")) == "1"
-        await set_setting(chat_id, "editmode", "0" if current else "1")
+        await toggle_setting(chat_id, "editmode")
+
+    elif data == "toggle_floodmode":
+        await toggle_setting(chat_id, "floodmode")
+
+    elif data == "toggle_spamshield":
+        await toggle_setting(chat_id, "spamshield")
+
+    elif data == "toggle_captcha":
+        await toggle_setting(chat_id, "captcha")
 
     elif data == "toggle_autodelete":
-        delay = int(await get_setting(chat_id, "autodelete_interval", "0") or 0)
-        await set_setting(chat_id, "autodelete_interval", "0" if delay else "30")
+        await toggle_number_setting(chat_id, "autodelete_interval", 30)
 
     else:
-        logger.warning(f"🛑 Unrecognized toggle key: {data}")
+        logger.warning("🛑 Unrecognized toggle key: %s", data)
@@ -13,14 +13,18 @@ from utils.db import (
     add_user,
     add_broadcast_group,
     add_broadcast_user,
+    get_approved_page,
+    count_approved,
 )
 from utils.errors import catch_errors
 from utils.messages import safe_edit_message
-from config import OWNER_ID, LOG_GROUP_ID
+from utils.notifier import notify
+from config import OWNER_ID
 
 logger = logging.getLogger(__name__)
 
 PANEL_IMAGE_URL = os.getenv("PANEL_IMAGE_URL", "https://files.catbox.moe/uvqeln.jpg")
+APPROVED_PAGE_SIZE = 50  # ~1.5k chars per page, well under the 4096 limit
 
 
 def mention_html(user_id: int, name: str) -> str:
@@ -44,12 +48,18 @@ async def build_settings_panel(chat_id: int) -> InlineKeyboardMarkup:
     bio = await get_bio_filter(chat_id)
     link = str(await get_setting(chat_id, "linkfilter", "0")) == "1"
     edit = str(await get_setting(chat_id, "editmode", "0")) == "1"
+    flood = str(await get_setting(chat_id, "floodmode", "0")) == "1"
+    spam = str(await get_setting(chat_id, "spamshield", "0")) == "1"
     delay = int(await get_setting(chat_id, "autodelete_interval", "0") or 0)
+    captcha = str(await get_setting(chat_id, "captcha", "0")) == "1"
 
     buttons = [
         [InlineKeyboardButton(f"🌐 BioLink {'✅' if bio else '❌'}", callback_data="toggle_biolink")],
         [InlineKeyboardButton(f"🔗 LinkFilter {'✅' if link else '❌'}", callback_data="toggle_linkfilter")],
         [InlineKeyboardButton(f"✏️ EditFilter {'✅' if edit else '❌'}", callback_data="toggle_editfilter")],
+        [InlineKeyboardButton(f"🌊 AntiFlood {'✅' if flood else '❌'}", callback_data="toggle_floodmode")],
+        [InlineKeyboardButton(f"🛰 SpamShield {'✅' if spam else '❌'}", callback_data="toggle_spamshield")],
+        [InlineKeyboardButton(f"🧩 Captcha {'✅' if captcha else '❌'}", callback_data="toggle_captcha")],
         [InlineKeyboardButton(
             f"🧹 AutoDelete {delay}s" if delay else "🧹 AutoDelete Off",
             callback_data="toggle_autodelete"
@@ -59,6 +69,30 @@ async def build_settings_panel(chat_id: int) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(buttons)
 
 
+# 👥 Approved users page
+async def build_approved_page(
+    chat_id: int,
+    *,
+    after: int | None = None,
+    before: int | None = None,
+) -> tuple[str, InlineKeyboardMarkup | None]:
+    ids, more = await get_approved_page(chat_id, after=after, before=before, limit=APPROVED_PAGE_SIZE)
+    if not ids:
+        return "No approved users.", None
+
+    total = await count_approved(chat_id)
+    text = f"<b>Approved Users</b> ({total} total)\n" + "\n".join(f"• <code>{uid}</code>" for uid in ids)
+
+    has_prev = more if before is not None else after is not None
+    has_next = more if before is None else True
+    nav = []
+    if has_prev:
+        nav.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"approved_prev:{ids[0]}"))
+    if has_next:
+        nav.append(InlineKeyboardButton("Next ➡️", callback_data=f"approved_next:{ids[-1]}"))
+    return text, InlineKeyboardMarkup([nav]) if nav else None
+
+
 # 📩 Welcome / Panel Sender
 async def send_start(
     client: Client,
@@ -105,14 +139,8 @@ async def send_start(
         parse_mode=ParseMode.HTML,
     )
 
-    if LOG_GROUP_ID and log_panel and chat.type == ChatType.PRIVATE:
-        try:
-            text = (
-                f"📥 /start used in DM by {mention_html(user.id, user.first_name)}"
-            )
-            await client.send_message(LOG_GROUP_ID, text, parse_mode=ParseMode.HTML)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Failed to send log: %s", exc)
+    if log_panel and chat.type == ChatType.PRIVATE:
+        notify(f"📥 /start used in DM by {mention_html(user.id, user.first_name)}")
 
 
 # 🔁 Shortcut for /menu
@@ -127,6 +155,8 @@ def get_help_keyboard(back_cb: str) -> InlineKeyboardMarkup:
         [InlineKeyboardButton("🧹 AutoDelete", callback_data="help_autodelete")],
         [InlineKeyboardButton("🔗 LinkFilter", callback_data="help_linkfilter")],
         [InlineKeyboardButton("✏️ EditMode", callback_data="help_editmode")],
+        [InlineKeyboardButton("🌊 AntiFlood", callback_data="help_antiflood")],
+        [InlineKeyboardButton("🛰 SpamShield", callback_data="help_spamshield")],
         [InlineKeyboardButton("👮 Admin", callback_data="help_admin")],
         [InlineKeyboardButton("📢 Broadcast", callback_data="help_broadcast")],
         [
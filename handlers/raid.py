@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+from pyrogram import Client, filters
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.errors import ChatAdminRequired, FloodWait
+from pyrogram.types import Message, ChatPermissions, ChatMemberUpdated
+
+from config import OWNER_ID, RAID_JOIN_THRESHOLD, RAID_WINDOW, RAID_LOCK_SECONDS
+from utils.errors import catch_errors
+from utils.db import is_approved
+from utils.perms import is_admin, bot_can, lost_bot_right, notify_missing_right, CAN_RESTRICT
+from utils.notifier import notify
+from utils.prefetch import PrefetchQueue
+from utils.raid import RaidShield
+from utils import audit
+
+logger = logging.getLogger(__name__)
+
+# Restrictions are queued so a raid of hundreds of joins never floods the API
+RESTRICT_CONCURRENCY = 4
+RESTRICT_RATE = 20  # restrict_chat_member calls started per second
+RESTRICT_MAX_PENDING = 20_000
+MIN_RESTRICT_SECONDS = 60  # Telegram treats restrictions under 30s as permanent
+
+_shield = RaidShield(RAID_JOIN_THRESHOLD, RAID_WINDOW, RAID_LOCK_SECONDS)
+_restrict_queue: PrefetchQueue | None = None
+_lift_timers: dict[int, asyncio.TimerHandle] = {}
+
+
+def register(app: Client) -> None:
+    global _restrict_queue
+    logger.info("✅ Registered: raid.py")
+
+    async def restrict_joiner(key, until: float) -> None:
+        chat_id, user_id = key
+        if user_id == OWNER_ID or await is_approved(chat_id, user_id):
+            return
+        if not await bot_can(app, chat_id, CAN_RESTRICT):
+            await notify_missing_right(app, chat_id, CAN_RESTRICT)
+            return
+        until = max(until, time.time() + MIN_RESTRICT_SECONDS)
+        for _ in range(2):
+            try:
+                # Admins (or bots an admin added and promoted) can join during a lockdown too
+                member = await app.get_chat_member(chat_id, user_id)
+                if member.status in {ChatMemberStatus.ADMINISTRATOR, ChatMemberStatus.OWNER}:
+                    return
+                await app.restrict_chat_member(
+                    chat_id,
+                    user_id,
+                    ChatPermissions(can_send_messages=False),
+                    until_date=datetime.fromtimestamp(until),
+                )
+                audit.record("mute", chat_id, user_id, reason="raid lockdown")
+                return
+            except FloodWait as e:
+                logger.warning("⏳ FloodWait during raid lockdown in %s: %s sec", chat_id, e.value)
+                await asyncio.sleep(e.value)
+            except ChatAdminRequired:
+                lost_bot_right(chat_id, CAN_RESTRICT)
+                await notify_missing_right(app, chat_id, CAN_RESTRICT)
+                return
+
+    _restrict_queue = PrefetchQueue(
+        "raid",
+        restrict_joiner,
+        concurrency=RESTRICT_CONCURRENCY,
+        rate=RESTRICT_RATE,
+        max_pending=RESTRICT_MAX_PENDING,
+        max_age=RAID_LOCK_SECONDS,
+    )
+
+    def schedule_lift(chat_id: int) -> None:
+        timer = _lift_timers.pop(chat_id, None)
+        if timer:
+            timer.cancel()
+        until = _shield.locked_until(chat_id)
+        if until:
+            delay = max(1.0, until - time.time())
+            _lift_timers[chat_id] = asyncio.get_running_loop().call_later(
+                delay, lambda: asyncio.create_task(announce_lift(chat_id))
+            )
+
+    async def announce_lift(chat_id: int) -> None:
+        _lift_timers.pop(chat_id, None)
+        if _shield.locked_until(chat_id):
+            schedule_lift(chat_id)  # extended by joins during the lockdown
+            return
+        logger.info("[RAID] Lockdown lifted in %s", chat_id)
+        audit.record("unlock", chat_id, reason="raid lockdown expired")
+        try:
+            await app.send_message(chat_id, "✅ Raid lockdown lifted. New members can talk again.")
+        except Exception as e:
+            logger.debug("Could not announce lockdown lift in %s: %s", chat_id, e)
+
+    def restrict(chat_id: int, user_ids, until: float) -> None:
+        for user_id in user_ids:
+            _restrict_queue.submit((chat_id, user_id), until)
+
+    async def on_join(chat_id: int, user) -> None:
+        if user.is_bot or user.is_self:
+            return
+        raiders = _shield.joined(chat_id, user.id)
+        until = _shield.locked_until(chat_id)
+        if not until:
+            return
+        if raiders is None:
+            restrict(chat_id, [user.id], until)
+            return
+
+        logger.warning("[RAID] %d joins in %ss in %s, locking down", len(raiders), RAID_WINDOW, chat_id)
+        audit.record("lock", chat_id, reason=f"{len(raiders)} joins in {RAID_WINDOW}s")
+        notify(f"🚨 Raid lockdown in <code>{chat_id}</code> ({len(raiders)} joins in {RAID_WINDOW}s)", urgent=True)
+        restrict(chat_id, raiders, until)
+        schedule_lift(chat_id)
+        try:
+            await app.send_message(
+                chat_id,
+                f"🚨 <b>Raid detected</b>: {len(raiders)} joins in {RAID_WINDOW}s.\n"
+                f"New members are muted for the next {RAID_LOCK_SECONDS // 60} minutes. "
+                "Admins can lift this with /raid off.",
+            )
+        except Exception as e:
+            logger.debug("Could not announce lockdown in %s: %s", chat_id, e)
+
+    @app.on_message(filters.new_chat_members & filters.group, group=-1)
+    @catch_errors
+    async def count_joins(client: Client, message: Message):
+        for user in message.new_chat_members:
+            await on_join(message.chat.id, user)
+
+    @app.on_chat_member_updated(filters.group, group=-1)
+    @catch_errors
+    async def count_member_joins(client: Client, update: ChatMemberUpdated):
+        member = update.new_chat_member
+        if not member or not member.user or member.status != ChatMemberStatus.MEMBER:
+            return
+        old = update.old_chat_member
+        if old and old.status not in {ChatMemberStatus.LEFT, ChatMemberStatus.BANNED}:
+            return
+        await on_join(update.chat.id, member.user)
+
+    @app.on_message(filters.command("raid") & filters.group)
+    @catch_errors
+    async def raid_cmd(client: Client, message: Message):
+        if not message.from_user or not await is_admin(client, message, message.from_user.id):
+            await message.reply_text("🔒 You must be an admin to use this.")
+            return
+        chat_id = message.chat.id
+        arg = message.command[1].lower() if len(message.command) > 1 else ""
+
+        if arg == "on":
+            _shield.lock(chat_id)
+            schedule_lift(chat_id)
+            audit.record("lock", chat_id, actor_id=message.from_user.id, reason="manual")
+            await message.reply_text(
+                f"🔒 Lockdown on: new members are muted for {RAID_LOCK_SECONDS // 60} minutes."
+            )
+        elif arg == "off":
+            timer = _lift_timers.pop(chat_id, None)
+            if timer:
+                timer.cancel()
+            if _shield.unlock(chat_id):
+                audit.record("unlock", chat_id, actor_id=message.from_user.id, reason="manual")
+                await message.reply_text(
+                    "🔓 Lockdown lifted. Members muted during it stay muted until it would have "
+                    "ended; use /unmute to release someone early."
+                )
+            else:
+                await message.reply_text("ℹ️ This chat is not locked down.")
+        else:
+            until = _shield.locked_until(chat_id)
+            if until:
+                status = f"🔒 Locked down for another {int(until - time.time()) // 60 + 1} min."
+            else:
+                status = "🔓 Not locked down."
+            limits = (
+                f"Lockdown starts at {RAID_JOIN_THRESHOLD} joins in {RAID_WINDOW}s."
+                if _shield.enabled else "Automatic raid detection is disabled."
+            )
+            await message.reply_text(f"{status}\n{limits}\nUsage: /raid on|off")
+
+
+def lockdown_until(chat_id: int) -> float:
+    """Return when the chat's raid lockdown ends, or 0 if it is not locked down."""
+    return _shield.locked_until(chat_id)
+
+
+async def stop_raid_shield() -> None:
+    for timer in _lift_timers.values():
+        timer.cancel()
+    _lift_timers.clear()
+    if _restrict_queue is not None:
+        await _restrict_queue.stop()
@@ -0,0 +1,184 @@
+import logging
+import re
+import time
+from html import escape
+
+from pyrogram import Client, filters
+from pyrogram.enums import ChatType, ParseMode
+from pyrogram.types import Message
+
+from config import OWNER_ID
+from utils.db import (
+    get_groups,
+    get_settings,
+    save_template,
+    get_template,
+    get_templates,
+    delete_template,
+    apply_settings,
+    OUTAGE_ERRORS,
+)
+from utils.errors import catch_errors
+
+logger = logging.getLogger(__name__)
+
+APPLY_BATCH = 500  # chats written per bulk_write
+PROGRESS_INTERVAL = 3.0  # seconds between progress edits
+
+# Settings a template may carry: on/off switches and non-negative numbers (with their minimum)
+SWITCH_SETTINGS = ("biofilter", "linkfilter", "editmode", "floodmode", "spamshield", "approval_mode", "captcha")
+NUMBER_SETTINGS = {
+    "flood_limit": 1,
+    "flood_window": 1,
+    "autodelete_interval": 0,
+    "captcha_timeout": 10,
+    "warn_expiry": 0,
+}
+TEMPLATE_SETTINGS = SWITCH_SETTINGS + tuple(NUMBER_SETTINGS)
+
+NAME_RE = re.compile(r"^[a-z0-9_-]{1,32}$")
+USAGE = (
+    "📐 <b>Settings templates</b>\n"
+    "<code>/template</code> - list templates\n"
+    "<code>/template save &lt;name&gt; key=value …</code> - define one "
+    "(in a group, without pairs, copies that group's settings)\n"
+    "<code>/template show &lt;name&gt;</code>, <code>/template del &lt;name&gt;</code>\n"
+    "<code>/template apply &lt;name&gt; all|here|&lt;chat_id&gt; …</code> - write it to chats\n"
+    f"Keys: {', '.join(TEMPLATE_SETTINGS)}"
+)
+
+
+def parse_settings(pairs: list[str]) -> dict[str, str]:
+    """Turn ``key=value`` arguments into stored setting values; raises ValueError on bad input."""
+    settings = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        key, value = key.lower(), value.lower()
+        if not sep or key not in TEMPLATE_SETTINGS:
+            raise ValueError(f"unknown setting {pair!r}")
+        if key in SWITCH_SETTINGS:
+            if value not in {"on", "off", "1", "0", "true", "false"}:
+                raise ValueError(f"{key} must be on or off")
+            settings[key] = "1" if value in {"on", "1", "true"} else "0"
+        else:
+            if not value.isdigit() or int(value) < NUMBER_SETTINGS[key]:
+                raise ValueError(f"{key} must be a number ≥ {NUMBER_SETTINGS[key]}")
+            settings[key] = str(int(value))
+    return settings
+
+
+def describe(settings: dict[str, str]) -> str:
+    return "\n".join(f"• <code>{key}</code> = {escape(str(value))}" for key, value in sorted(settings.items()))
+
+
+def register(app: Client) -> None:
+    logger.info("✅ Registered: templates.py")
+
+    async def apply_to_chats(status: Message, name: str, settings: dict, chat_ids: list[int]) -> None:
+        total = len(chat_ids)
+        done = 0
+        last_edit = time.monotonic()
+        started = last_edit
+        for offset in range(0, total, APPLY_BATCH):
+            batch = chat_ids[offset:offset + APPLY_BATCH]
+            try:
+                await apply_settings(batch, settings)
+            except OUTAGE_ERRORS as e:
+                logger.warning("[TEMPLATE] %r stopped after %d/%d chats: %s", name, done, total, e)
+                await status.edit_text(
+                    f"❗ MongoDB became unavailable after {done:,}/{total:,} chats. "
+                    "Applying again is safe and finishes the rest."
+                )
+                return
+            done += len(batch)
+            if done < total and time.monotonic() - last_edit >= PROGRESS_INTERVAL:
+                last_edit = time.monotonic()
+                try:
+                    await status.edit_text(f"⏳ Applying <b>{escape(name)}</b>: {done:,}/{total:,} chats…")
+                except Exception as e:
+                    logger.debug("Could not update template progress: %s", e)
+        elapsed = time.monotonic() - started
+        logger.info("[TEMPLATE] Applied %r to %d chats in %.1fs", name, total, elapsed)
+        await status.edit_text(
+            f"✅ Applied <b>{escape(name)}</b> to {total:,} chats in {elapsed:.1f}s.\n{describe(settings)}",
+            parse_mode=ParseMode.HTML,
+        )
+
+    @app.on_message(filters.command("template") & filters.user(OWNER_ID))
+    @catch_errors
+    async def template_cmd(client: Client, message: Message) -> None:
+        """Define named settings templates and apply them to many chats at once."""
+        args = message.command[1:]
+        action = args[0].lower() if args else ""
+        name = args[1].lower() if len(args) > 1 else ""
+
+        try:
+            if not action:
+                templates = await get_templates()
+                if not templates:
+                    await message.reply_text(USAGE, parse_mode=ParseMode.HTML)
+                    return
+                lines = ["📐 <b>Templates</b>"]
+                lines.extend(
+                    f"• <b>{escape(tpl)}</b> — {', '.join(f'{k}={v}' for k, v in sorted(s.items()))}"
+                    for tpl, s in templates.items()
+                )
+                await message.reply_text("\n".join(lines), parse_mode=ParseMode.HTML)
+                return
+
+            if action not in {"save", "show", "del", "apply"} or not NAME_RE.match(name):
+                await message.reply_text(USAGE, parse_mode=ParseMode.HTML)
+                return
+
+            if action == "save":
+                if len(args) > 2:
+                    try:
+                        settings = parse_settings(args[2:])
+                    except ValueError as e:
+                        await message.reply_text(f"❗ {escape(str(e))}")
+                        return
+                elif message.chat.type in {ChatType.GROUP, ChatType.SUPERGROUP}:
+                    current = await get_settings(message.chat.id)
+                    settings = {k: v for k, v in current.items() if k in TEMPLATE_SETTINGS and v is not None}
+                else:
+                    await message.reply_text(USAGE, parse_mode=ParseMode.HTML)
+                    return
+                if not settings:
+                    await message.reply_text("❗ Nothing to save: no template settings given or set here.")
+                    return
+                await save_template(name, settings)
+                await message.reply_text(
+                    f"💾 Saved template <b>{escape(name)}</b>\n{describe(settings)}", parse_mode=ParseMode.HTML
+                )
+                return
+
+            if action == "del":
+                deleted = await delete_template(name)
+                await message.reply_text(f"🗑 Deleted {escape(name)}." if deleted else "❗ No such template.")
+                return
+
+            settings = await get_template(name)
+            if settings is None:
+                await message.reply_text("❗ No such template.")
+                return
+            if action == "show":
+                await message.reply_text(
+                    f"📐 <b>{escape(name)}</b>\n{describe(settings)}", parse_mode=ParseMode.HTML
+                )
+                return
+
+            targets = [t.lower() for t in args[2:]]
+            if targets == ["all"]:
+                chat_ids = await get_groups()
+            elif targets == ["here"] and message.chat.type in {ChatType.GROUP, ChatType.SUPERGROUP}:
+                chat_ids = [message.chat.id]
+            elif targets and all(re.fullmatch(r"-?\d+", t) for t in targets):
+                chat_ids = list(dict.fromkeys(int(t) for t in targets))
+            else:
+                await message.reply_text("❗ Usage: /template apply &lt;name&gt; all|here|&lt;chat_id&gt; …")
+                return
+            logger.info("[TEMPLATE] Applying %r to %d chats for %s", name, len(chat_ids), message.from_user.id)
+            status = await message.reply_text(f"⏳ Applying <b>{escape(name)}</b> to {len(chat_ids):,} chats…")
+            await apply_to_chats(status, name, settings, chat_ids)
+        except OUTAGE_ERRORS:
+            await message.reply_text("❗ MongoDB is unavailable right now.")
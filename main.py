@@ -12,18 +12,44 @@ from config import (
     MONGO_URI,
     MONGO_DB,
     LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_SAMPLING,
+    LOOP_LAG_THRESHOLD_MS,
+    RUNTIME_PROFILE,
+    BOT_WORKERS,
+    USE_UVLOOP,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    SESSION_STORAGE,
 )
 from handlers import register_all
+from handlers.filters import stop_bio_prefetch
+from handlers.raid import stop_raid_shield
+from handlers.captcha import start_captcha, stop_captcha
 from utils.db import init_db, close_db
+from utils.audit import start_audit, stop_audit
+from utils.stats import start_stats, stop_stats
+from utils.notifier import start_notifier, stop_notifier
+from utils.logsetup import setup_logging, stop_logging
+from utils.watchdog import start_watchdog, stop_watchdog
 from utils.webhook import delete_webhook
 
 # ───────────────── Logging ─────────────────
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=getattr(logging, LOG_LEVEL, logging.INFO),
-)
+setup_logging(LOG_LEVEL, LOG_FORMAT, LOG_SAMPLING)
 logger = logging.getLogger("OxygenBot")
 
+# ───────────────── Event Loop ─────────────────
+# Must be installed before the Client grabs its event loop
+if USE_UVLOOP:
+    try:
+        import uvloop
+
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        logger.info("⚡ uvloop enabled")
+    except ImportError:
+        logger.warning("USE_UVLOOP is set but uvloop is not installed; using asyncio")
+
 # ───────────────── Bot Client ─────────────────
 bot = Client(
     name="oxygen_bot",
@@ -31,7 +57,13 @@ bot = Client(
     api_hash=API_HASH,
     bot_token=BOT_TOKEN,
     parse_mode=ParseMode.HTML,
+    workers=BOT_WORKERS,
 )
+if SESSION_STORAGE == "mongo":
+    # Ephemeral disks lose the .session file; keep auth key and peers in MongoDB instead
+    from utils.session import MongoStorage
+
+    bot.storage = MongoStorage(bot.name)
 
 # ───────────────── Graceful Shutdown (Heroku safe) ─────────────────
 def _shutdown(*_):
@@ -44,11 +76,23 @@ signal.signal(signal.SIGINT, _shutdown)
 
 # ───────────────── Main Lifecycle ─────────────────
 async def main() -> None:
-    logger.info("🚀 Starting OxygenBot...")
+    logger.info(
+        "🚀 Starting OxygenBot (profile=%s, workers=%s, mongo pool=%s-%s)...",
+        RUNTIME_PROFILE, BOT_WORKERS, MONGO_MIN_POOL_SIZE, MONGO_MAX_POOL_SIZE,
+    )
+    if LOOP_LAG_THRESHOLD_MS > 0:
+        start_watchdog(LOOP_LAG_THRESHOLD_MS / 1000)
 
     # Database
-    await init_db(MONGO_URI, MONGO_DB)
+    await init_db(
+        MONGO_URI,
+        MONGO_DB,
+        max_pool_size=MONGO_MAX_POOL_SIZE,
+        min_pool_size=MONGO_MIN_POOL_SIZE,
+    )
     logger.info("✅ MongoDB connected.")
+    start_audit()
+    start_stats()
 
     # Ensure polling mode
     await delete_webhook(BOT_TOKEN)
@@ -57,12 +101,22 @@ async def main() -> None:
     # Start bot
     async with bot:
         register_all(bot)
+        start_captcha(bot)
+        start_notifier(bot)
         logger.info("🤖 Bot started successfully. Waiting for updates...")
         await idle()
+        await stop_bio_prefetch()
+        await stop_raid_shield()
+        await stop_captcha()
+        await stop_notifier()
 
     # Cleanup
+    await stop_watchdog()
+    await stop_stats()
+    await stop_audit()
     await close_db()
     logger.info("🛑 Bot stopped. MongoDB connection closed.")
+    stop_logging()
 
 # ───────────────── Entrypoint ─────────────────
 if __name__ == "__main__":
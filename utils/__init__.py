@@ -1,3 +1,11 @@
-from . import db, errors, perms, webhook, messages
+import importlib
 
-__all__ = ["db", "errors", "perms", "webhook", "messages"]
+__all__ = ["breaker", "profiler", "plan", "prefetch", "raid", "timewheel", "session", "stats", "db", "errors", "perms", "webhook", "messages", "flood", "fingerprint", "matcher", "domains", "links", "textnorm", "audit", "notifier", "logsetup", "watchdog"]
+
+
+def __getattr__(name: str):
+    # Submodules load on first use, so pure helpers (textnorm, links, …) import
+    # without the bot's config, MongoDB or Pyrogram
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
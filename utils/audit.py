@@ -0,0 +1,124 @@
+"""Moderation audit log written to MongoDB in batches off the hot path."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from config import AUDIT_QUEUE_SIZE
+from utils.db import get_db, add_chat_stats
+
+logger = logging.getLogger(__name__)
+
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL = 2.0  # seconds
+
+# Per-chat counters kept alongside the log, so /stats never has to scan it
+STAT_FIELDS = {"delete": "violations", "warn": "warnings", "mute": "mutes", "kick": "kicks", "ban": "bans"}
+
+_queue: asyncio.Queue | None = None
+_task: asyncio.Task | None = None
+_dropped = 0
+
+
+def record(
+    action: str,
+    chat_id: int,
+    user_id: int | None = None,
+    *,
+    actor_id: int | None = None,
+    reason: str | None = None,
+) -> None:
+    """Queue a moderation event. Never blocks; drops the event if the queue is full."""
+    global _dropped
+    if _queue is None:
+        return
+    event = {
+        "ts": datetime.now(timezone.utc),
+        "action": action,
+        "chat_id": chat_id,
+        "user_id": user_id,
+        "actor_id": actor_id,
+        "reason": reason,
+    }
+    try:
+        _queue.put_nowait(event)
+    except asyncio.QueueFull:
+        _dropped += 1
+        if _dropped == 1 or _dropped % 1000 == 0:
+            logger.warning("Audit queue full, %d events dropped so far", _dropped)
+
+
+def dropped_count() -> int:
+    return _dropped
+
+
+async def _writer() -> None:
+    coll = get_db().audit_log
+    loop = asyncio.get_running_loop()
+    while True:
+        batch: list[dict] = []
+        try:
+            batch.append(await _queue.get())
+            deadline = loop.time() + AUDIT_FLUSH_INTERVAL
+            while len(batch) < AUDIT_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            if batch:
+                await _flush(coll, batch)
+            raise
+        await _flush(coll, batch)
+
+
+async def _flush(coll, batch: list[dict]) -> None:
+    counts: dict[int, dict[str, int]] = {}
+    for event in batch:
+        field = STAT_FIELDS.get(event["action"])
+        if field:
+            chat = counts.setdefault(event["chat_id"], {})
+            chat[field] = chat.get(field, 0) + 1
+    try:
+        await coll.insert_many(batch, ordered=False)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to write %d audit events: %s", len(batch), exc)
+    # Any error escaping here would end the writer task and silently drop every later event
+    try:
+        await add_chat_stats(counts)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to update moderation counters for %d chats: %s", len(counts), exc)
+
+
+def start_audit() -> None:
+    """Start the background writer. Call after ``init_db``."""
+    global _queue, _task
+    if _task is not None:
+        return
+    _queue = asyncio.Queue(maxsize=AUDIT_QUEUE_SIZE)
+    _task = asyncio.create_task(_writer())
+
+
+async def stop_audit() -> None:
+    """Stop the writer and flush whatever is still queued."""
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    with suppress(asyncio.CancelledError):
+        await _task
+    _task = None
+    batch = []
+    while not _queue.empty():
+        batch.append(_queue.get_nowait())
+    if batch:
+        await _flush(get_db().audit_log, batch)
+
+
+__all__ = ["record", "dropped_count", "start_audit", "stop_audit"]
@@ -0,0 +1,76 @@
+"""Circuit breaker used to fail fast while MongoDB is unreachable."""
+
+from __future__ import annotations
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Trip after ``threshold`` consecutive failures.
+
+    While open, :meth:`allow` returns False so callers can skip the I/O
+    entirely. After ``reset_after`` seconds a single trial call is let through
+    (half-open) while everyone else keeps failing fast; success closes the
+    breaker, failure opens it again. A probe that never reports back is
+    replaced after another ``reset_after`` seconds.
+    """
+
+    def __init__(self, name: str, threshold: int = 3, reset_after: float = 15.0) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.probe_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN:
+            if now - self.opened_at < self.reset_after:
+                return False
+            self.state = HALF_OPEN
+            logger.info("🟡 %s circuit half-open, trying a request", self.name)
+        elif now - self.probe_at < self.reset_after:
+            return False  # a probe is already in flight
+        self.probe_at = now
+        return True
+
+    def success(self) -> bool:
+        """Record a success. Returns True if this closed a tripped breaker."""
+        self.failures = 0
+        if self.state == CLOSED:
+            return False
+        self.state = CLOSED
+        logger.info("🟢 %s circuit closed, back to normal", self.name)
+        return True
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+            if self.state == CLOSED:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            logger.warning("🔴 %s circuit open after %d failures", self.name, self.failures)
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "open_for": round(time.monotonic() - self.opened_at, 1) if self.state != CLOSED else 0,
+        }
+
+
+__all__ = ["CircuitBreaker", "CLOSED", "OPEN", "HALF_OPEN"]
@@ -1,11 +1,44 @@
 """Database helpers using Motor (async MongoDB)."""
 
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable
+
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from pymongo import ReturnDocument
+from pymongo import ReturnDocument, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+from config import DB_JOURNAL_SIZE, DB_READ_CACHE_SIZE
+from utils.breaker import CircuitBreaker, CLOSED
+
+logger = logging.getLogger(__name__)
 
 _client: AsyncIOMotorClient | None = None
 _db: AsyncIOMotorDatabase | None = None
 
+AUDIT_TTL_SECONDS = 90 * 24 * 3600  # keep moderation history for 90 days
+
+DB_OP_TIMEOUT = 2.0  # seconds before a single operation counts as an outage
+JOURNAL_SIZE = DB_JOURNAL_SIZE  # writes buffered while MongoDB is unreachable
+READ_CACHE_SIZE = DB_READ_CACHE_SIZE  # last known values served while MongoDB is unreachable
+
+
+class DatabaseUnavailable(RuntimeError):
+    """Raised instead of waiting on MongoDB while the circuit is open."""
+
+
+# Errors that mean "MongoDB is unreachable" rather than "the query was wrong"
+OUTAGE_ERRORS = (DatabaseUnavailable, ConnectionFailure, asyncio.TimeoutError)
+
+_breaker = CircuitBreaker("MongoDB")
+_journal: deque[Callable[[], Awaitable[Any]]] = deque()
+_journal_dropped = 0
+_replay_task: asyncio.Task | None = None
+_read_cache: OrderedDict[tuple, Any] = OrderedDict()
+_setting_listeners: list[Callable[[int], None]] = []
+
 
 # ------------------ CORE ------------------ #
 def get_db() -> AsyncIOMotorDatabase:
@@ -15,18 +48,172 @@ def get_db() -> AsyncIOMotorDatabase:
     return _db
 
 
+async def _call(op: Callable[[], Awaitable[Any]]) -> Any:
+    """Run ``op`` through the circuit breaker with a per-operation timeout."""
+    if not _breaker.allow():
+        raise DatabaseUnavailable("MongoDB circuit is open")
+    try:
+        result = await asyncio.wait_for(op(), DB_OP_TIMEOUT)
+    except (ConnectionFailure, asyncio.TimeoutError):
+        _breaker.failure()
+        raise
+    except Exception:
+        # The server answered, just not happily: that still proves it is reachable
+        if _breaker.success():
+            _schedule_replay()
+        raise
+    if _breaker.success():
+        _schedule_replay()
+    return result
+
+
+def _remember(key: tuple, value: Any) -> None:
+    _read_cache[key] = value
+    _read_cache.move_to_end(key)
+    if len(_read_cache) > READ_CACHE_SIZE:
+        _read_cache.popitem(last=False)
+
+
+async def _cached_read(key: tuple, op: Callable[[], Awaitable[Any]], default: Any) -> Any:
+    """Read through the breaker, falling back to the last known value on outage."""
+    try:
+        value = await _call(op)
+    except OUTAGE_ERRORS:
+        return _read_cache.get(key, default)
+    _remember(key, value)
+    return value
+
+
+def _buffer(op: Callable[[], Awaitable[Any]]) -> None:
+    global _journal_dropped
+    if len(_journal) >= JOURNAL_SIZE:
+        _journal.popleft()
+        _journal_dropped += 1
+    _journal.append(op)
+
+
+async def _write(op: Callable[[], Awaitable[Any]]) -> None:
+    """Write through the breaker, buffering the write in the journal on outage."""
+    if _journal:
+        # Older writes are still waiting; going direct could land before them
+        _buffer(op)
+        if _breaker.state == CLOSED:
+            _schedule_replay()
+        return
+    try:
+        await _call(op)
+    except OUTAGE_ERRORS as exc:
+        _buffer(op)
+        logger.debug("Buffered write while MongoDB is unavailable: %s", exc)
+
+
+def _schedule_replay() -> None:
+    global _replay_task
+    if _journal and (_replay_task is None or _replay_task.done()):
+        _replay_task = asyncio.create_task(_replay_journal())
+
+
+async def _replay_journal() -> None:
+    logger.info("Replaying %d buffered MongoDB writes", len(_journal))
+    while _journal:
+        op = _journal[0]
+        try:
+            await _call(op)
+        except OUTAGE_ERRORS:
+            return  # retried when the breaker closes again
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Dropping buffered write that failed on replay: %s", exc)
+        if _journal and _journal[0] is op:  # may have been dropped for room meanwhile
+            _journal.popleft()
+
+
+async def guarded(op: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a query from outside this module through the breaker and timeout (see :func:`_call`)."""
+    return await _call(op)
+
+
+async def guarded_write(op: Callable[[], Awaitable[Any]]) -> None:
+    """Write from outside this module, journaled on outage like this module's own writes."""
+    await _write(op)
+
+
+def db_status() -> dict:
+    """Return circuit breaker state and journal size for health output."""
+    return {
+        **_breaker.status(),
+        "journal": len(_journal),
+        "journal_dropped": _journal_dropped,
+    }
+
+
 # ------------------ SETTINGS: linkfilter, editmode, etc ------------------ #
+def on_setting_change(callback: Callable[[int], None]) -> None:
+    """Call ``callback(chat_id)`` whenever a setting of that chat is written."""
+    _setting_listeners.append(callback)
+
+
+def _setting_changed(chat_id: int) -> None:
+    for callback in _setting_listeners:
+        callback(chat_id)
+
+
 async def get_setting(chat_id: int, key: str, default: str | None = None) -> str | None:
-    doc = await _db.kv_settings.find_one({"chat_id": chat_id, "key": key})
-    return doc.get("value") if doc else default
+    async def op():
+        doc = await _db.kv_settings.find_one({"chat_id": chat_id, "key": key})
+        return doc.get("value") if doc else None
+
+    value = await _cached_read(("setting", chat_id, key), op, None)
+    return default if value is None else value
+
+
+async def get_settings(chat_id: int) -> dict[str, str]:
+    """Return every stored setting of the chat in one query."""
+    docs = await _call(lambda: _db.kv_settings.find(
+        {"chat_id": chat_id}, {"key": 1, "value": 1, "_id": 0}
+    ).to_list(None))
+    settings = {doc["key"]: doc.get("value") for doc in docs}
+    for key, value in settings.items():
+        _remember(("setting", chat_id, key), value)
+    return settings
 
 
 async def set_setting(chat_id: int, key: str, value: str) -> None:
-    await _db.kv_settings.update_one(
+    _remember(("setting", chat_id, key), value)
+    _setting_changed(chat_id)
+    await _write(lambda: _db.kv_settings.update_one(
         {"chat_id": chat_id, "key": key},
         {"$set": {"value": value}},
         upsert=True,
+    ))
+
+
+async def _set_setting_expr(chat_id: int, key: str, expr: dict) -> str:
+    """Set a setting to a server-side expression of its old value in one round trip."""
+    doc = await _call(lambda: _db.kv_settings.find_one_and_update(
+        {"chat_id": chat_id, "key": key},
+        [{"$set": {"value": expr}}],
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    ))
+    _remember(("setting", chat_id, key), doc["value"])
+    _setting_changed(chat_id)
+    return doc["value"]
+
+
+async def toggle_setting(chat_id: int, key: str) -> bool:
+    """Atomically flip an on/off setting (missing counts as off) and return the new state."""
+    is_on = {"$in": [{"$toLower": {"$toString": {"$ifNull": ["$value", "0"]}}}, ["1", "true", "on", "yes"]]}
+    value = await _set_setting_expr(chat_id, key, {"$cond": [is_on, "0", "1"]})
+    return value == "1"
+
+
+async def toggle_number_setting(chat_id: int, key: str, on_value: int) -> int:
+    """Atomically switch a numeric setting between 0 and ``on_value``; returns the new value."""
+    current = {"$convert": {"input": "$value", "to": "int", "onError": 0, "onNull": 0}}
+    value = await _set_setting_expr(
+        chat_id, key, {"$cond": [{"$gt": [current, 0]}, "0", str(on_value)]}
     )
+    return int(value)
 
 
 # ------------------ BIO FILTER ------------------ #
@@ -44,24 +231,61 @@ async def set_bio_filter(chat_id: int, enabled: bool) -> None:
 
 # ------------------ APPROVAL SYSTEM ------------------ #
 async def approve_user(chat_id: int, user_id: int) -> None:
-    await _db.approved_users.update_one(
+    _remember(("approved", chat_id, user_id), True)
+    await _write(lambda: _db.approved_users.update_one(
         {"chat_id": chat_id, "user_id": user_id},
         {"$set": {"approved": True}},
         upsert=True,
-    )
+    ))
 
 
 async def unapprove_user(chat_id: int, user_id: int) -> None:
-    await _db.approved_users.delete_one({"chat_id": chat_id, "user_id": user_id})
+    _remember(("approved", chat_id, user_id), False)
+    await _write(lambda: _db.approved_users.delete_one({"chat_id": chat_id, "user_id": user_id}))
 
 
 async def is_approved(chat_id: int, user_id: int) -> bool:
-    return await _db.approved_users.find_one({"chat_id": chat_id, "user_id": user_id}) is not None
+    async def op():
+        return await _db.approved_users.find_one({"chat_id": chat_id, "user_id": user_id}) is not None
+
+    return await _cached_read(("approved", chat_id, user_id), op, False)
 
 
 async def get_approved(chat_id: int) -> list[int]:
-    cursor = _db.approved_users.find({"chat_id": chat_id})
-    return [doc["user_id"] async for doc in cursor]
+    docs = await _call(lambda: _db.approved_users.find({"chat_id": chat_id}).to_list(None))
+    return [doc["user_id"] for doc in docs]
+
+
+async def get_approved_page(
+    chat_id: int,
+    *,
+    after: int | None = None,
+    before: int | None = None,
+    limit: int = 50,
+) -> tuple[list[int], bool]:
+    """Return one page of approved user ids ordered by id, using the (chat_id, user_id) index.
+
+    Pass ``after`` (last id of the current page) for the next page or ``before``
+    (first id) for the previous one. The flag tells whether more ids exist in
+    the direction of travel.
+    """
+    query: dict = {"chat_id": chat_id}
+    direction = 1
+    if before is not None:
+        query["user_id"] = {"$lt": before}
+        direction = -1
+    elif after is not None:
+        query["user_id"] = {"$gt": after}
+    docs = await _call(lambda: _db.approved_users.find(query, {"user_id": 1, "_id": 0})
+                       .sort("user_id", direction).limit(limit + 1).to_list(limit + 1))
+    ids = [doc["user_id"] for doc in docs[:limit]]
+    if direction == -1:
+        ids.reverse()
+    return ids, len(docs) > limit
+
+
+async def count_approved(chat_id: int) -> int:
+    return await _call(lambda: _db.approved_users.count_documents({"chat_id": chat_id}))
 
 
 async def set_approval_mode(chat_id: int, enabled: bool) -> None:
@@ -74,37 +298,216 @@ async def get_approval_mode(chat_id: int) -> bool:
 
 
 async def toggle_approval_mode(chat_id: int) -> bool:
-    current = await get_approval_mode(chat_id)
-    await set_approval_mode(chat_id, not current)
-    return not current
+    return await toggle_setting(chat_id, "approval_mode")
 
 
 # ------------------ WARNINGS ------------------ #
-async def increment_warning(chat_id: int, user_id: int) -> int:
-    doc = await _db.warnings.find_one_and_update(
+WARN_EXPIRY_DEFAULT = 30 * 24 * 3600  # seconds a warning counts; 0 keeps them forever
+MAX_WARNINGS_KEPT = 10
+
+_warn_expiry: dict[int, int] = {}
+
+
+async def get_warn_expiry(chat_id: int) -> int:
+    """Return the chat's warning lifetime in seconds (cached; only changed through this module)."""
+    expiry = _warn_expiry.get(chat_id)
+    if expiry is not None:
+        return expiry
+    key = ("setting", chat_id, "warn_expiry")
+    try:
+        doc = await _call(lambda: _db.kv_settings.find_one({"chat_id": chat_id, "key": "warn_expiry"}))
+    except OUTAGE_ERRORS:
+        # Fall back without caching, so the real value is picked up once MongoDB is back
+        value, cache = _read_cache.get(key), False
+    else:
+        value, cache = doc.get("value") if doc else None, True
+        _remember(key, value)
+    try:
+        expiry = WARN_EXPIRY_DEFAULT if value is None else int(value)
+    except (TypeError, ValueError):
+        expiry = WARN_EXPIRY_DEFAULT
+    if cache:
+        _warn_expiry[chat_id] = expiry
+    return expiry
+
+
+async def set_warn_expiry(chat_id: int, seconds: int) -> None:
+    _warn_expiry[chat_id] = seconds
+    await set_setting(chat_id, "warn_expiry", str(seconds))
+
+
+async def increment_warning(chat_id: int, user_id: int, limit: int | None = None) -> int:
+    """Add a timestamped warning and return how many are still active.
+
+    Expired warnings are dropped in the same server-side update, and the
+    ``expires_at`` TTL index removes the document once the newest one lapses.
+    With ``limit``, reaching it also clears the warnings in that same update,
+    so callers don't need a separate :func:`reset_warning`.
+    """
+    expiry = await get_warn_expiry(chat_id)
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=expiry) if expiry else datetime.fromtimestamp(0, timezone.utc)
+    pipeline = [
+        {"$set": {"warns": {"$slice": [
+            {"$concatArrays": [
+                {"$filter": {
+                    "input": {"$ifNull": ["$warns", []]},
+                    "cond": {"$gt": ["$$this", cutoff]},
+                }},
+                [now],
+            ]},
+            -MAX_WARNINGS_KEPT,
+        ]}}},
+        {"$set": {
+            "count": {"$size": "$warns"},
+            "expires_at": {"$literal": now + timedelta(seconds=expiry) if expiry else None},
+        }},
+    ]
+    if limit:
+        pipeline.append(
+            {"$set": {"warns": {"$cond": [{"$gte": ["$count", limit]}, [], "$warns"]}}}
+        )
+    doc = await _call(lambda: _db.warnings.find_one_and_update(
         {"chat_id": chat_id, "user_id": user_id},
-        {"$inc": {"count": 1}},
+        pipeline,
         upsert=True,
         return_document=ReturnDocument.AFTER,
-    )
+    ))
     return doc["count"]
 
 
 async def reset_warning(chat_id: int, user_id: int) -> None:
-    await _db.warnings.delete_one({"chat_id": chat_id, "user_id": user_id})
+    await _write(lambda: _db.warnings.delete_one({"chat_id": chat_id, "user_id": user_id}))
+
+
+# ------------------ SETTINGS TEMPLATES ------------------ #
+async def save_template(name: str, settings: dict[str, str]) -> None:
+    await _call(lambda: _db.settings_templates.update_one(
+        {"_id": name}, {"$set": {"settings": settings}}, upsert=True
+    ))
+
+
+async def get_template(name: str) -> dict[str, str] | None:
+    doc = await _call(lambda: _db.settings_templates.find_one({"_id": name}))
+    return doc["settings"] if doc else None
+
+
+async def get_templates() -> dict[str, dict[str, str]]:
+    docs = await _call(lambda: _db.settings_templates.find().sort("_id", 1).to_list(None))
+    return {doc["_id"]: doc["settings"] for doc in docs}
+
+
+async def delete_template(name: str) -> bool:
+    result = await _call(lambda: _db.settings_templates.delete_one({"_id": name}))
+    return result.deleted_count > 0
+
+
+async def apply_settings(chat_ids: list[int], settings: dict[str, str]) -> None:
+    """Write the same settings to every chat in one ``bulk_write`` and refresh their caches."""
+    if not chat_ids or not settings:
+        return
+    ops = [
+        UpdateOne({"chat_id": chat_id, "key": key}, {"$set": {"value": value}}, upsert=True)
+        for chat_id in chat_ids
+        for key, value in settings.items()
+    ]
+    await _call(lambda: _db.kv_settings.bulk_write(ops, ordered=False))
+    for chat_id in chat_ids:
+        for key, value in settings.items():
+            _remember(("setting", chat_id, key), value)
+        _warn_expiry.pop(chat_id, None)
+        _setting_changed(chat_id)
+
+
+# ------------------ KEYWORD BLACKLIST ------------------ #
+async def add_blacklist_word(chat_id: int, word: str) -> None:
+    await _call(lambda: _db.blacklist.update_one(
+        {"chat_id": chat_id, "word": word},
+        {"$set": {"word": word}},
+        upsert=True,
+    ))
+
+
+async def remove_blacklist_word(chat_id: int, word: str) -> bool:
+    result = await _call(lambda: _db.blacklist.delete_one({"chat_id": chat_id, "word": word}))
+    return result.deleted_count > 0
+
+
+async def get_blacklist(chat_id: int) -> list[str]:
+    docs = await _call(lambda: _db.blacklist.find({"chat_id": chat_id}).to_list(None))
+    return [doc["word"] for doc in docs]
+
+
+# ------------------ DOMAIN RULES ------------------ #
+async def set_domain_rule(chat_id: int, domain: str, mode: str) -> None:
+    """Store an ``allow`` or ``block`` rule for ``domain`` in the chat."""
+    await _call(lambda: _db.domain_rules.update_one(
+        {"chat_id": chat_id, "domain": domain},
+        {"$set": {"mode": mode}},
+        upsert=True,
+    ))
+
+
+async def remove_domain_rule(chat_id: int, domain: str) -> bool:
+    result = await _call(lambda: _db.domain_rules.delete_one({"chat_id": chat_id, "domain": domain}))
+    return result.deleted_count > 0
+
+
+async def get_domain_rules(chat_id: int) -> dict[str, list[str]]:
+    rules: dict[str, list[str]] = {"allow": [], "block": []}
+    docs = await _call(lambda: _db.domain_rules.find({"chat_id": chat_id}).to_list(None))
+    for doc in docs:
+        rules.setdefault(doc["mode"], []).append(doc["domain"])
+    return rules
+
+
+# ------------------ AUDIT LOG ------------------ #
+async def get_audit_events(
+    chat_id: int | None = None,
+    user_id: int | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """Return the most recent moderation events for a chat and/or user."""
+    query: dict = {}
+    if chat_id is not None:
+        query["chat_id"] = chat_id
+    if user_id is not None:
+        query["user_id"] = user_id
+    return await _call(lambda: _db.audit_log.find(query).sort("ts", DESCENDING).to_list(limit))
+
+
+# ------------------ CAPTCHA ------------------ #
+async def add_captcha_pending(chat_id: int, user_id: int, deadline: float, message_id: int) -> None:
+    """Persist a pending verification so it survives restarts (``deadline`` is a Unix time)."""
+    await _write(lambda: _db.captcha_pending.update_one(
+        {"chat_id": chat_id, "user_id": user_id},
+        {"$set": {"deadline": deadline, "message_id": message_id}},
+        upsert=True,
+    ))
+
+
+async def remove_captcha_pending(entries: list[tuple[int, int]]) -> None:
+    """Forget pending verifications given as ``(chat_id, user_id)`` pairs, in one query."""
+    if entries:
+        query = {"$or": [{"chat_id": chat_id, "user_id": user_id} for chat_id, user_id in entries]}
+        await _write(lambda: _db.captcha_pending.delete_many(query))
+
+
+async def get_captcha_pending() -> list[dict]:
+    return await _call(lambda: _db.captcha_pending.find({}, {"_id": 0}).to_list(None))
 
 
 # ------------------ BROADCAST STORAGE ------------------ #
 async def add_broadcast_user(user_id: int) -> None:
-    await _db.broadcast_users.update_one({"_id": user_id}, {"$set": {}}, upsert=True)
+    await _write(lambda: _db.broadcast_users.update_one({"_id": user_id}, {"$set": {}}, upsert=True))
 
 
 async def add_broadcast_group(chat_id: int) -> None:
-    await _db.broadcast_groups.update_one({"_id": chat_id}, {"$set": {}}, upsert=True)
+    await _write(lambda: _db.broadcast_groups.update_one({"_id": chat_id}, {"$set": {}}, upsert=True))
 
 
 async def remove_broadcast_group(chat_id: int) -> None:
-    await _db.broadcast_groups.delete_one({"_id": chat_id})
+    await _write(lambda: _db.broadcast_groups.delete_one({"_id": chat_id}))
 
 
 async def get_broadcast_users() -> list[int]:
@@ -119,15 +522,15 @@ async def get_broadcast_groups() -> list[int]:
 
 # ------------------ USER / GROUP LOGGING ------------------ #
 async def add_user(user_id: int) -> None:
-    await _db.users.update_one({"_id": user_id}, {"$set": {}}, upsert=True)
+    await _write(lambda: _db.users.update_one({"_id": user_id}, {"$set": {}}, upsert=True))
 
 
 async def add_group(chat_id: int) -> None:
-    await _db.groups.update_one({"_id": chat_id}, {"$set": {}}, upsert=True)
+    await _write(lambda: _db.groups.update_one({"_id": chat_id}, {"$set": {}}, upsert=True))
 
 
 async def remove_group(chat_id: int) -> None:
-    await _db.groups.delete_one({"_id": chat_id})
+    await _write(lambda: _db.groups.delete_one({"_id": chat_id}))
 
 
 async def get_users() -> list[int]:
@@ -140,12 +543,85 @@ async def get_groups() -> list[int]:
     return [doc["_id"] async for doc in cursor]
 
 
+# ------------------ STATS ------------------ #
+ACTIVE_CHAT_WINDOW = 24 * 3600  # a chat counts as active if it had a message this recently
+STATS_TOTALS_ID = "global"
+
+
+async def _upsert_chat_stats(ops: list[UpdateOne]) -> None:
+    async def op():
+        try:
+            await _db.chat_stats.bulk_write(ops, ordered=False)
+        except BulkWriteError as exc:
+            errors = exc.details.get("writeErrors", [])
+            if not errors or any(error.get("code") != 11000 for error in errors):
+                raise
+            # Two upserts raced to create the same chat's document; only the losers run again
+            await _db.chat_stats.bulk_write([ops[error["index"]] for error in errors], ordered=False)
+
+    await _write(op)
+
+
+async def add_chat_stats(counts: dict[int, dict[str, int]]) -> None:
+    """Add per-chat moderation counters (e.g. ``{chat_id: {"warnings": 2}}``) in one bulk write."""
+    if not counts:
+        return
+    totals: dict[str, int] = {}
+    ops = []
+    for chat_id, fields in counts.items():
+        ops.append(UpdateOne({"chat_id": chat_id}, {"$inc": fields}, upsert=True))
+        for field, value in fields.items():
+            totals[field] = totals.get(field, 0) + value
+    await _upsert_chat_stats(ops)
+    await _write(lambda: _db.stats_totals.update_one(
+        {"_id": STATS_TOTALS_ID}, {"$inc": totals}, upsert=True
+    ))
+
+
+async def touch_active_chats(chat_ids: list[int], ts: datetime) -> None:
+    """Record that the chats had messages at ``ts``."""
+    if chat_ids:
+        ops = [UpdateOne({"chat_id": chat_id}, {"$max": {"last_active": ts}}, upsert=True) for chat_id in chat_ids]
+        await _upsert_chat_stats(ops)
+
+
+async def get_stats(top: int = 5) -> dict:
+    """Totals from collection metadata and counters; every query is index- or metadata-only."""
+    since = datetime.now(timezone.utc) - timedelta(seconds=ACTIVE_CHAT_WINDOW)
+
+    async def op():
+        return {
+            "users": await _db.users.estimated_document_count(),
+            "groups": await _db.groups.estimated_document_count(),
+            "approved": await _db.approved_users.estimated_document_count(),
+            "audit_events": await _db.audit_log.estimated_document_count(),
+            "active_chats": await _db.chat_stats.count_documents({"last_active": {"$gte": since}}),
+            "totals": await _db.stats_totals.find_one({"_id": STATS_TOTALS_ID}, {"_id": 0}) or {},
+            "top_chats": await _db.chat_stats.find(
+                {"violations": {"$gt": 0}}, {"_id": 0, "chat_id": 1, "violations": 1}
+            ).sort("violations", DESCENDING).limit(top).to_list(top),
+        }
+
+    return await _call(op)
+
+
 # ------------------ LIFECYCLE MANAGEMENT ------------------ #
-async def init_db(uri: str, db_name: str) -> None:
+async def init_db(
+    uri: str,
+    db_name: str,
+    *,
+    max_pool_size: int = 100,
+    min_pool_size: int = 0,
+) -> None:
     """Initialize MongoDB with required collections and indexes."""
     global _client, _db
     # Short timeout so startup fails fast if DB is unreachable
-    _client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
+    _client = AsyncIOMotorClient(
+        uri,
+        serverSelectionTimeoutMS=5000,
+        maxPoolSize=max_pool_size,
+        minPoolSize=min_pool_size,
+    )
     _db = _client[db_name]
 
     # Force a connection attempt to provide immediate feedback
@@ -157,6 +633,16 @@ async def init_db(uri: str, db_name: str) -> None:
     await _db.kv_settings.create_index([("chat_id", 1), ("key", 1)], unique=True)
     await _db.approved_users.create_index([("chat_id", 1), ("user_id", 1)], unique=True)
     await _db.warnings.create_index([("chat_id", 1), ("user_id", 1)], unique=True)
+    await _db.warnings.create_index("expires_at", expireAfterSeconds=0)
+    await _db.blacklist.create_index([("chat_id", 1), ("word", 1)], unique=True)
+    await _db.domain_rules.create_index([("chat_id", 1), ("domain", 1)], unique=True)
+    await _db.audit_log.create_index("ts", expireAfterSeconds=AUDIT_TTL_SECONDS)
+    await _db.audit_log.create_index([("chat_id", 1), ("ts", -1)])
+    await _db.audit_log.create_index([("user_id", 1), ("ts", -1)])
+    await _db.captcha_pending.create_index([("chat_id", 1), ("user_id", 1)], unique=True)
+    await _db.chat_stats.create_index("chat_id", unique=True)
+    await _db.chat_stats.create_index("last_active")
+    await _db.chat_stats.create_index([("violations", -1)])
 
 
 async def close_db() -> None:
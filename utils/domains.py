@@ -0,0 +1,93 @@
+"""Domain allow/block lists matched through a reversed-label suffix trie."""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+
+class _Node:
+    __slots__ = ("children", "whole", "wildcard", "paths")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.whole = False  # domain itself and every subdomain
+        self.wildcard = False  # subdomains only (``*.example.com``)
+        self.paths: set[str] = set()  # first path segments (``t.me/channel``)
+
+
+def split_rule(rule: str) -> tuple[str, str]:
+    """Split a rule such as ``https://t.me/Chan`` into ``("t.me", "chan")``."""
+    rule = rule.strip().lower()
+    for scheme in ("https://", "http://"):
+        if rule.startswith(scheme):
+            rule = rule[len(scheme):]
+            break
+    host, _, path = rule.partition("/")
+    host = host.split("?", 1)[0].split(":", 1)[0]
+    return host.rstrip("."), path.split("/", 1)[0].split("?", 1)[0]
+
+
+class DomainTrie:
+    """Suffix trie over domain labels stored right to left.
+
+    ``example.com`` matches the domain and all of its subdomains,
+    ``*.example.com`` only the subdomains and ``t.me/name`` a single path.
+    Lookups walk the labels of the queried host, so their cost depends on
+    the host and not on how many rules were added.
+    """
+
+    __slots__ = ("_root", "rules")
+
+    def __init__(self, rules: Iterable[str] = ()) -> None:
+        self._root = _Node()
+        self.rules: list[str] = []
+        for rule in rules:
+            self.add(rule)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def add(self, rule: str) -> None:
+        host, path = split_rule(rule)
+        wildcard = host.startswith("*.")
+        if wildcard:
+            host = host[2:]
+        if not host:
+            return
+        node = self._root
+        for label in reversed(host.split(".")):
+            node = node.children.setdefault(label, _Node())
+        if path:
+            node.paths.add(path)
+        elif wildcard:
+            node.wildcard = True
+        else:
+            node.whole = True
+        self.rules.append(rule)
+
+    def match(self, host: str, path: str = "") -> bool:
+        labels = host.lower().rstrip(".").split(".")
+        node = self._root
+        for remaining in range(len(labels) - 1, -1, -1):
+            node = node.children.get(labels[remaining])
+            if node is None:
+                return False
+            if node.whole or (node.wildcard and remaining):
+                return True
+        return bool(path) and path.lower() in node.paths
+
+
+class DomainPolicy:
+    """Combined allow and block tries for one chat."""
+
+    __slots__ = ("allow", "block")
+
+    def __init__(self, allow: Iterable[str] = (), block: Iterable[str] = ()) -> None:
+        self.allow = DomainTrie(allow)
+        self.block = DomainTrie(block)
+
+    def is_blocked(self, host: str, path: str = "") -> bool:
+        return self.block.match(host, path)
+
+
+__all__ = ["DomainTrie", "DomainPolicy", "split_rule"]
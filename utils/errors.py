@@ -4,8 +4,11 @@ from __future__ import annotations
 
 import functools
 import logging
+import time
 import traceback
 
+from utils import profiler
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,12 +17,16 @@ def catch_errors(func):
 
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
+        started = time.perf_counter() if profiler.active else None
         try:
             return await func(*args, **kwargs)
         except Exception as e:  # noqa: BLE001
             logger.exception("🚨 Unhandled exception in %s: %s", func.__name__, e)
             tb = traceback.format_exc()
             logger.debug("Traceback:\n%s", tb)
+        finally:
+            if started is not None:
+                profiler.record_handler(func.__name__, time.perf_counter() - started)
 
     return wrapper
 
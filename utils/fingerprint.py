@@ -0,0 +1,153 @@
+"""Near-duplicate detection for messages spammed across many chats."""
+
+from __future__ import annotations
+
+import random
+import re
+import time
+from collections import OrderedDict
+
+_WORD_RE = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+
+# MinHash: 32 cheap 64-bit permutations grouped into 8 LSH bands of 4 rows.
+BANDS = 8
+ROWS = 4
+_rng = random.Random(0x5EED)
+_PERMS = [
+    (_rng.getrandbits(64), _rng.getrandbits(64) | 1) for _ in range(BANDS * ROWS)
+]
+
+
+def normalize(text: str) -> set[str]:
+    """Return the set of lowercase word tokens in ``text``."""
+    return set(_WORD_RE.findall((text or "").casefold()))
+
+
+def minhash(tokens: set[str]) -> tuple[int, ...]:
+    """Return the MinHash signature of a non-empty token set."""
+    hashes = [hash(token) & _MASK64 for token in tokens]
+    return tuple(
+        min(((h ^ xor) * mul) & _MASK64 for h in hashes) for xor, mul in _PERMS
+    )
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _band_keys(sig: tuple[int, ...]) -> list[int]:
+    return [hash(sig[i * ROWS:(i + 1) * ROWS]) for i in range(BANDS)]
+
+
+class _Entry:
+    __slots__ = ("key", "sig", "bands", "chats", "seen")
+
+    def __init__(self, key: int, sig: tuple[int, ...], bands: list[int], now: float) -> None:
+        self.key = key
+        self.sig = sig
+        self.bands = bands
+        self.chats: dict[int, float] = {}
+        self.seen = now
+
+
+class FingerprintIndex:
+    """Bounded, time-decayed index of recent message signatures.
+
+    Messages whose estimated Jaccard similarity reaches ``threshold`` are
+    treated as the same payload. Lookups go through ``BANDS`` LSH tables, so
+    the cost does not depend on how many signatures are stored. Entries unseen
+    for ``window`` seconds expire and at most ``max_entries`` are kept.
+    """
+
+    def __init__(
+        self,
+        window: float = 600,
+        max_entries: int = 50_000,
+        threshold: float = 0.6,
+        min_tokens: int = 4,
+    ) -> None:
+        self.window = window
+        self.max_entries = max(1, max_entries)
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._bands: list[dict[int, int]] = [{} for _ in range(BANDS)]
+        self._next_key = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def observe(self, chat_id: int, text: str, now: float | None = None) -> int:
+        """Record ``text`` as seen in ``chat_id``.
+
+        Returns the number of distinct chats the payload appeared in during
+        the window, or 0 if the text is too short to fingerprint.
+        """
+        tokens = normalize(text)
+        if len(tokens) < self.min_tokens:
+            return 0
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+
+        sig = minhash(tokens)
+        bands = _band_keys(sig)
+        entry = self._lookup(sig, bands)
+        if entry is None:
+            entry = _Entry(self._next_key, sig, bands, now)
+            self._next_key += 1
+            self._insert(entry)
+        else:
+            self._entries.move_to_end(entry.key)
+            cutoff = now - self.window
+            for cid in [c for c, ts in entry.chats.items() if ts < cutoff]:
+                del entry.chats[cid]
+
+        entry.chats[chat_id] = now
+        entry.seen = now
+        return len(entry.chats)
+
+    def forget(self, chat_id: int, text: str) -> None:
+        """Undo an :meth:`observe` of ``text`` in ``chat_id``, e.g. once its sender turns out to be exempt."""
+        tokens = normalize(text)
+        if len(tokens) < self.min_tokens:
+            return
+        sig = minhash(tokens)
+        entry = self._lookup(sig, _band_keys(sig))
+        if entry is not None:
+            entry.chats.pop(chat_id, None)
+
+    def _lookup(self, sig: tuple[int, ...], bands: list[int]) -> _Entry | None:
+        for table, band in zip(self._bands, bands):
+            key = table.get(band)
+            if key is None:
+                continue
+            entry = self._entries[key]
+            if similarity(sig, entry.sig) >= self.threshold:
+                return entry
+        return None
+
+    def _insert(self, entry: _Entry) -> None:
+        self._entries[entry.key] = entry
+        for table, band in zip(self._bands, entry.bands):
+            table[band] = entry.key
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: int) -> None:
+        entry = self._entries.pop(key)
+        for table, band in zip(self._bands, entry.bands):
+            if table.get(band) == key:
+                del table[band]
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.seen >= cutoff:
+                break
+            self._remove(key)
+
+
+__all__ = ["FingerprintIndex", "normalize", "minhash", "similarity"]
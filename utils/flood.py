@@ -0,0 +1,88 @@
+"""Sliding-window message counters used by the anti-flood filter."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class _Window:
+    """Bucketed counter for a single key."""
+
+    __slots__ = ("width", "head", "total", "counts", "seen")
+
+    def __init__(self, buckets: int, width: float, head: int, now: float) -> None:
+        self.width = width
+        self.head = head
+        self.total = 0
+        self.counts = [0] * buckets
+        self.seen = now
+
+
+class FloodTracker:
+    """Count events per key inside a sliding time window.
+
+    Each key owns a fixed ring of ``buckets`` counters, so a hit costs O(1)
+    and the memory used per key never grows. Keys are kept in LRU order and
+    idle ones are expired as new hits arrive; ``max_entries`` caps the total.
+    """
+
+    def __init__(self, buckets: int = 10, max_entries: int = 100_000) -> None:
+        self.buckets = max(1, buckets)
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[Hashable, _Window] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit(self, key: Hashable, window: float, now: float | None = None) -> int:
+        """Record one event for ``key`` and return the count within ``window`` seconds."""
+        now = time.monotonic() if now is None else now
+        width = window / self.buckets
+        head = int(now // width)
+
+        entry = self._entries.get(key)
+        if entry is None or entry.width != width:
+            entry = _Window(self.buckets, width, head, now)
+            self._entries[key] = entry
+        else:
+            self._entries.move_to_end(key)
+            self._advance(entry, head)
+
+        entry.counts[head % self.buckets] += 1
+        entry.total += 1
+        entry.seen = now
+        self._expire(now)
+        return entry.total
+
+    def reset(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def _advance(self, entry: _Window, head: int) -> None:
+        steps = head - entry.head
+        if steps <= 0:
+            return
+        if steps >= self.buckets:
+            entry.counts = [0] * self.buckets
+            entry.total = 0
+        else:
+            for i in range(entry.head + 1, head + 1):
+                slot = i % self.buckets
+                entry.total -= entry.counts[slot]
+                entry.counts[slot] = 0
+        entry.head = head
+
+    def _expire(self, now: float) -> None:
+        entries = self._entries
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        # Oldest keys sit at the front; stop at the first one still active.
+        while entries:
+            key, entry = next(iter(entries.items()))
+            if now - entry.seen < entry.width * self.buckets:
+                break
+            del entries[key]
+
+
+__all__ = ["FloodTracker"]
@@ -0,0 +1,30 @@
+"""Link detection shared by the message filters and offline tooling."""
+
+from __future__ import annotations
+
+import re
+
+from utils.domains import DomainPolicy, split_rule
+
+LINK_RE = re.compile(
+    r"(?:https?://\S+|tg://\S+|t\.me/\S+|telegram\.me/\S+|(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,})",
+    re.IGNORECASE,
+)
+
+
+def contains_link(text: str) -> bool:
+    return bool(LINK_RE.search(text or ""))
+
+
+def has_forbidden_link(text: str, policy: DomainPolicy, linkfilter: bool) -> bool:
+    """Return True if ``text`` has a blocklisted link, or any non-allowlisted link when LinkFilter is on."""
+    for match in LINK_RE.finditer(text or ""):
+        host, path = split_rule(match.group(0))
+        if policy.is_blocked(host, path):
+            return True
+        if linkfilter and not policy.allow.match(host, path):
+            return True
+    return False
+
+
+__all__ = ["LINK_RE", "contains_link", "has_forbidden_link"]
@@ -0,0 +1,77 @@
+"""Multi-pattern keyword matching (Aho-Corasick)."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+
+class KeywordMatcher:
+    """Find whole-word occurrences of many phrases in a single pass.
+
+    Patterns are case-insensitive. Scanning is linear in the length of the
+    text no matter how many patterns were compiled.
+    """
+
+    __slots__ = ("patterns", "_goto", "_fail", "_out")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns = tuple(sorted({p.casefold().strip() for p in patterns if p and p.strip()}))
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Lengths of every pattern ending at each state, fail links included
+        self._out: list[tuple[int, ...]] = [()]
+        for pattern in self.patterns:
+            self._add(pattern)
+        self._build()
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = (len(pattern),)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> str | None:
+        """Return the first blacklisted phrase found in ``text``, if any."""
+        if not self.patterns or not text:
+            return None
+        text = text.casefold()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length in out[state]:
+                start = end - length
+                if (start == 0 or not text[start - 1].isalnum()) and (
+                    end == len(text) or not text[end].isalnum()
+                ):
+                    return text[start:end]
+        return None
+
+
+__all__ = ["KeywordMatcher"]
@@ -0,0 +1,116 @@
+"""Batch LOG_GROUP_ID notifications into periodic digest messages."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import suppress
+
+from pyrogram import Client
+from pyrogram.enums import ParseMode
+
+from config import LOG_GROUP_ID, LOG_DIGEST_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_LEN = 4096
+MAX_PENDING = 5_000  # oldest events are dropped beyond this
+
+_client: Client | None = None
+_pending: deque[str] = deque()
+_dropped = 0
+_task: asyncio.Task | None = None
+_sends: set[asyncio.Task] = set()  # urgent sends in flight; the loop only keeps weak references
+
+
+def notify(text: str, *, urgent: bool = False) -> None:
+    """Queue an HTML line for the log group.
+
+    Regular events are sent together every ``LOG_DIGEST_INTERVAL`` seconds;
+    ``urgent`` events (or any event when the interval is 0) go out at once.
+    """
+    global _dropped
+    if not LOG_GROUP_ID or _client is None:
+        return
+    if urgent or LOG_DIGEST_INTERVAL <= 0:
+        task = asyncio.create_task(_send([text]))
+        _sends.add(task)
+        task.add_done_callback(_sends.discard)
+        return
+    if len(_pending) >= MAX_PENDING:
+        _pending.popleft()
+        _dropped += 1
+    _pending.append(f"<code>{time.strftime('%H:%M:%S')}</code> {text}")
+
+
+def split_digest(lines: list[str], header: str = "", limit: int = MAX_MESSAGE_LEN) -> list[str]:
+    """Join ``lines`` into as few messages as possible, each within ``limit`` chars."""
+    chunks: list[str] = []
+    current = header
+    for line in lines:
+        if len(line) > limit - len(header) - 1:
+            line = line[: limit - len(header) - 2] + "…"
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = f"{header}\n{line}" if header else line
+        else:
+            current = candidate
+    if current and current != header:
+        chunks.append(current)
+    return chunks
+
+
+async def _send(lines: list[str], header: str = "") -> None:
+    for chunk in split_digest(lines, header):
+        try:
+            await _client.send_message(LOG_GROUP_ID, chunk, parse_mode=ParseMode.HTML)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to send log: %s", exc)
+
+
+async def flush() -> None:
+    """Send everything queued so far as one digest."""
+    global _dropped
+    if not _pending:
+        return
+    lines = list(_pending)
+    _pending.clear()
+    header = f"🗒 <b>Log digest</b> ({len(lines)} events)"
+    if _dropped:
+        header += f", {_dropped} dropped"
+        _dropped = 0
+    await _send(lines, header)
+
+
+async def _loop() -> None:
+    while True:
+        await asyncio.sleep(LOG_DIGEST_INTERVAL)
+        await flush()
+
+
+def start_notifier(client: Client) -> None:
+    """Attach the running client and start the digest timer."""
+    global _client, _task
+    _client = client
+    if LOG_GROUP_ID and LOG_DIGEST_INTERVAL > 0 and _task is None:
+        _task = asyncio.create_task(_loop())
+
+
+async def stop_notifier() -> None:
+    """Stop the timer and send any pending events."""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _task
+        _task = None
+    if _sends:
+        await asyncio.gather(*_sends, return_exceptions=True)
+    if _client is not None:
+        await flush()
+
+
+__all__ = ["notify", "flush", "split_digest", "start_notifier", "stop_notifier"]
@@ -1,13 +1,24 @@
 """Permission utilities."""
 
 import logging
+import time
 from pyrogram import Client
 from config import OWNER_ID
 from pyrogram.types import Message, ChatMember
-from pyrogram.enums import ChatType, ChatMemberStatus
+from pyrogram.enums import ChatType, ChatMemberStatus, ParseMode
 
 logger = logging.getLogger(__name__)
 
+# Admin rights the bot needs, with the names Telegram shows in the admin editor
+CAN_DELETE = "can_delete_messages"
+CAN_RESTRICT = "can_restrict_members"
+RIGHT_LABELS = {CAN_DELETE: "Delete messages", CAN_RESTRICT: "Ban users"}
+
+BOT_RIGHTS_TTL = 10 * 60  # seconds; my_chat_member updates refresh it sooner
+
+_bot_rights: dict[int, tuple[frozenset[str], float]] = {}
+_rights_noticed: set[tuple[int, str]] = set()
+
 async def is_admin(client: Client, message: Message, user_id: int | None = None) -> bool:
     """
     Check whether the specified user (or message sender) is an admin in the current chat.
@@ -40,3 +51,61 @@ async def is_admin(client: Client, message: Message, user_id: int | None = None)
             exc,
         )
         return False
+
+
+def _rights_of(member: ChatMember) -> frozenset[str]:
+    if member.status == ChatMemberStatus.OWNER:
+        return frozenset(RIGHT_LABELS)
+    if member.status != ChatMemberStatus.ADMINISTRATOR or not member.privileges:
+        return frozenset()
+    return frozenset(right for right in RIGHT_LABELS if getattr(member.privileges, right, False))
+
+
+def update_bot_rights(chat_id: int, member: ChatMember) -> None:
+    """Store the bot's own membership in ``chat_id`` (from my_chat_member or get_chat_member)."""
+    rights = _rights_of(member)
+    _bot_rights[chat_id] = (rights, time.monotonic())
+    # Only a right the bot holds again may be noticed again once it goes missing;
+    # the periodic refresh of an unchanged set must not repeat the notice
+    for right in rights:
+        _rights_noticed.discard((chat_id, right))
+
+
+def lost_bot_right(chat_id: int, right: str) -> None:
+    """Record that an action just failed because the bot lacks ``right``."""
+    rights, fetched_at = _bot_rights.get(chat_id, (frozenset(RIGHT_LABELS), time.monotonic()))
+    _bot_rights[chat_id] = (rights - {right}, fetched_at)
+
+
+async def bot_can(client: Client, chat_id: int, right: str) -> bool:
+    """Return True if the bot holds ``right`` in the chat, from a cache refreshed every BOT_RIGHTS_TTL."""
+    cached = _bot_rights.get(chat_id)
+    if cached and time.monotonic() - cached[1] < BOT_RIGHTS_TTL:
+        return right in cached[0]
+
+    try:
+        member = await client.get_chat_member(chat_id, "me")
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Could not fetch own rights in chat %s: %s", chat_id, exc)
+        return True  # unknown: let the action try and fail on its own
+    update_bot_rights(chat_id, member)
+    return right in _bot_rights[chat_id][0]
+
+
+def missing_right_text(right: str) -> str:
+    return (
+        f"⚠️ I need the <b>{RIGHT_LABELS[right]}</b> admin right to do this. "
+        "Please promote me with it."
+    )
+
+
+async def notify_missing_right(client: Client, chat_id: int, right: str) -> None:
+    """Tell the chat once that the bot lacks ``right``; repeated calls are no-ops."""
+    if (chat_id, right) in _rights_noticed:
+        return
+    _rights_noticed.add((chat_id, right))
+    logger.info("Missing %s in chat %s, moderation actions skipped", right, chat_id)
+    try:
+        await client.send_message(chat_id, missing_right_text(right), parse_mode=ParseMode.HTML)
+    except Exception as exc:  # noqa: BLE001
+        logger.debug("Could not send missing-right notice to %s: %s", chat_id, exc)
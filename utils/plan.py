@@ -0,0 +1,117 @@
+"""Per-chat moderation plans.
+
+A plan is compiled once from a chat's settings and lists, in order, the
+checks that actually apply to its messages. Handlers read the plan instead of
+querying every setting per message, and the pre-dispatch filter uses it to
+drop updates for chats where nothing would happen.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+# Order in which moderate_message evaluates checks
+CHECK_ORDER = ("bio", "approval", "flood", "spam", "blacklist", "links")
+
+# Checks that only look at the message text and need no lookups to evaluate
+CONTENT_CHECKS = frozenset({"spam", "blacklist", "links"})
+
+# kv_settings keys a plan is compiled from
+PLAN_SETTINGS = (
+    "biofilter",
+    "approval_mode",
+    "floodmode",
+    "spamshield",
+    "flood_limit",
+    "flood_window",
+    "linkfilter",
+    "editmode",
+    "autodelete_interval",
+    "captcha",
+    "captcha_timeout",
+)
+
+FLOOD_DEFAULT_LIMIT = 5  # messages
+FLOOD_DEFAULT_WINDOW = 10  # seconds
+CAPTCHA_DEFAULT_TIMEOUT = 120  # seconds
+
+
+@dataclass(frozen=True)
+class ModerationPlan:
+    checks: tuple[str, ...] = ()
+    flood_limit: int = FLOOD_DEFAULT_LIMIT
+    flood_window: int = FLOOD_DEFAULT_WINDOW
+    linkfilter: bool = False
+    autodelete: int = 0
+    edit_delete: bool = False
+    captcha_timeout: int = 0  # seconds new members get to verify, 0 when captcha is off
+
+    def wants_message(self, has_content: bool) -> bool:
+        """Return True if a new message needs the moderation handler at all."""
+        if self.autodelete > 0 or not CONTENT_CHECKS.issuperset(self.checks):
+            return True
+        return has_content and bool(self.checks)
+
+    @property
+    def wants_edits(self) -> bool:
+        # Edited messages are only ever removed on the auto-delete timer
+        return self.edit_delete and self.autodelete > 0
+
+
+EMPTY_PLAN = ModerationPlan()
+
+
+def _on(value) -> bool:
+    return str(value).lower() in {"1", "true", "on", "yes"}
+
+
+def _int(value, default: int) -> int:
+    try:
+        return int(value or default)
+    except (TypeError, ValueError):
+        return default
+
+
+def compile_plan(
+    settings: dict[str, str | None],
+    *,
+    has_blacklist: bool,
+    has_domain_blocks: bool,
+    spam_enabled: bool,
+) -> ModerationPlan:
+    """Build the plan for one chat from its raw settings and rule lists."""
+    linkfilter = _on(settings.get("linkfilter"))
+    enabled = {
+        "bio": _on(settings.get("biofilter")),
+        "approval": _on(settings.get("approval_mode")),
+        "flood": _on(settings.get("floodmode")),
+        "spam": spam_enabled and _on(settings.get("spamshield")),
+        "blacklist": has_blacklist,
+        "links": linkfilter or has_domain_blocks,
+    }
+    limit = _int(settings.get("flood_limit"), FLOOD_DEFAULT_LIMIT)
+    window = _int(settings.get("flood_window"), FLOOD_DEFAULT_WINDOW)
+    return ModerationPlan(
+        checks=tuple(check for check in CHECK_ORDER if enabled[check]),
+        flood_limit=limit if limit > 0 else FLOOD_DEFAULT_LIMIT,
+        flood_window=window if window > 0 else FLOOD_DEFAULT_WINDOW,
+        linkfilter=linkfilter,
+        autodelete=max(0, _int(settings.get("autodelete_interval"), 0)),
+        edit_delete=_on(settings.get("editmode")),
+        captcha_timeout=(
+            max(1, _int(settings.get("captcha_timeout"), CAPTCHA_DEFAULT_TIMEOUT))
+            if _on(settings.get("captcha")) else 0
+        ),
+    )
+
+
+__all__ = [
+    "ModerationPlan",
+    "EMPTY_PLAN",
+    "CHECK_ORDER",
+    "PLAN_SETTINGS",
+    "FLOOD_DEFAULT_LIMIT",
+    "FLOOD_DEFAULT_WINDOW",
+    "CAPTCHA_DEFAULT_TIMEOUT",
+    "compile_plan",
+]
@@ -0,0 +1,127 @@
+"""Background prefetch queue with deduplication, bounded concurrency and rate limiting."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchQueue:
+    """Run ``fetch(key, item)`` in the background for submitted keys.
+
+    A key that is already queued or being fetched is not queued again. When
+    ``max_pending`` keys are waiting, the oldest one is dropped to make room,
+    and keys that waited longer than ``max_age`` seconds are skipped: by then
+    the work is likely to have been done on demand anyway. At most
+    ``concurrency`` fetches run at once and at most ``rate`` start per second.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[Hashable, Any], Awaitable[None]],
+        *,
+        concurrency: int = 4,
+        rate: float = 20.0,
+        max_pending: int = 1_000,
+        max_age: float = 60.0,
+    ) -> None:
+        self.name = name
+        self._fetch = fetch
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.max_pending = max_pending
+        self.max_age = max_age
+        self._pending: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._running: dict[Hashable, asyncio.Future] = {}
+        self._wakeup = asyncio.Event()
+        self._next_start = 0.0
+        self._workers: list[asyncio.Task] = []
+        self.done = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, key: Hashable, item: Any = None) -> bool:
+        """Queue ``key``; returns False if it is already queued or running.
+
+        Resubmitting a queued key with an ``item`` replaces the queued item.
+        """
+        if key in self._pending:
+            if item is not None:
+                self._pending[key] = (self._pending[key][0], item)
+            return False
+        if key in self._running:
+            return False
+        if len(self._pending) >= self.max_pending:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[key] = (time.monotonic(), item)
+        if not self._workers:
+            self.start()
+        self._wakeup.set()
+        return True
+
+    def running(self, key: Hashable) -> asyncio.Future | None:
+        """Return a future resolved when the in-flight fetch of ``key`` ends, if any."""
+        return self._running.get(key)
+
+    async def _next(self) -> tuple[Hashable, Any]:
+        while True:
+            while self._pending:
+                key, (queued_at, item) = self._pending.popitem(last=False)
+                if time.monotonic() - queued_at <= self.max_age:
+                    return key, item
+                self.dropped += 1
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    async def _throttle(self) -> None:
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            key, item = await self._next()
+            done = self._running[key] = loop.create_future()
+            try:
+                await self._throttle()
+                await self._fetch(key, item)
+                self.done += 1
+            except Exception as exc:  # noqa: BLE001
+                self.failed += 1
+                logger.debug("%s prefetch of %s failed: %s", self.name, key, exc)
+            finally:
+                del self._running[key]
+                done.set_result(None)
+
+    def start(self) -> None:
+        """Start the workers. Must be called from the running event loop."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def status(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "running": len(self._running),
+            "done": self.done,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+__all__ = ["PrefetchQueue"]
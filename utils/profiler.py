@@ -0,0 +1,123 @@
+"""On-demand sampling profiler for the live bot.
+
+While a session is running, a ``SIGPROF`` interval timer samples the stack
+of whatever Python code is executing every few milliseconds of CPU time, and
+``catch_errors`` records the wall time of every handler call. The signal is
+delivered between bytecodes on the main (event loop) thread, so samples land
+inside the running coroutine rather than wherever the loop happens to yield.
+Nothing is collected when no session is active.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from html import escape
+
+MAX_DEPTH = 64
+
+active = False
+_started = 0.0
+_previous_handler = None
+_stacks: Counter[str] = Counter()
+_handlers: dict[str, list[float]] = {}  # name -> [calls, total seconds, max seconds]
+
+
+@dataclass
+class Report:
+    duration: float
+    samples: int
+    stacks: Counter[str] = field(default_factory=Counter)
+    handlers: dict[str, list[float]] = field(default_factory=dict)
+
+
+def record_handler(name: str, elapsed: float) -> None:
+    stats = _handlers.get(name)
+    if stats is None:
+        _handlers[name] = [1, elapsed, elapsed]
+    else:
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _on_sample(signum, frame) -> None:
+    labels = []
+    while frame is not None and len(labels) < MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if labels:
+        _stacks[";".join(reversed(labels))] += 1
+
+
+def supported() -> bool:
+    return hasattr(signal, "setitimer") and hasattr(signal, "SIGPROF")
+
+
+def start(interval: float = 0.005) -> bool:
+    """Start a session. Must run on the main thread; returns False if one is running."""
+    global active, _started, _previous_handler
+    if active or not supported():
+        return False
+    _stacks.clear()
+    _handlers.clear()
+    _previous_handler = signal.signal(signal.SIGPROF, _on_sample)
+    signal.setitimer(signal.ITIMER_PROF, interval, interval)
+    _started = time.monotonic()
+    active = True
+    return True
+
+
+def stop() -> Report:
+    """End the session and return what was collected."""
+    global active
+    if active:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, _previous_handler or signal.SIG_DFL)
+    active = False
+    return Report(
+        duration=time.monotonic() - _started,
+        samples=sum(_stacks.values()),
+        stacks=Counter(_stacks),
+        handlers={name: list(stats) for name, stats in _handlers.items()},
+    )
+
+
+def collapsed(report: Report) -> str:
+    """Render stacks in the collapsed format read by flamegraph.pl and speedscope."""
+    return "".join(f"{stack} {count}\n" for stack, count in report.stacks.most_common())
+
+
+def summary(report: Report, top: int = 10) -> str:
+    """HTML summary: slowest handlers and the functions most often on top of the stack."""
+    lines = [f"📊 <b>Profile</b> — {report.duration:.1f}s, {report.samples} samples"]
+
+    if report.handlers:
+        lines.append("\n<b>Handlers</b> (calls / total / avg / max ms)")
+        ranked = sorted(report.handlers.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (calls, total, worst) in ranked[:top]:
+            lines.append(
+                f"• <code>{escape(name)}</code> {int(calls)} / {total * 1e3:.0f} / "
+                f"{total / calls * 1e3:.1f} / {worst * 1e3:.1f}"
+            )
+
+    leaf: Counter[str] = Counter()
+    for stack, count in report.stacks.items():
+        leaf[stack.rsplit(";", 1)[-1]] += count
+    if leaf:
+        lines.append("\n<b>Top frames</b> (self samples)")
+        for label, count in leaf.most_common(top):
+            lines.append(f"• <code>{escape(label)}</code> {count} ({count / report.samples:.0%})")
+    return "\n".join(lines)
+
+
+__all__ = ["Report", "active", "record_handler", "supported", "start", "stop", "collapsed", "summary"]
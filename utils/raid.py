@@ -0,0 +1,74 @@
+"""Join-raid detection with per-chat temporary lockdowns."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+
+
+class RaidShield:
+    """Detect ``threshold`` or more joins within ``window`` seconds in a chat.
+
+    Each chat keeps only its last ``threshold`` joins, so the sliding window
+    is exact and costs O(threshold) memory. A detected raid locks the chat for
+    ``lock_seconds``; joins while locked keep extending it as long as the rate
+    stays above the threshold. At most ``max_chats`` chats are tracked (LRU).
+    """
+
+    def __init__(
+        self, threshold: int, window: float, lock_seconds: float, max_chats: int = 10_000
+    ) -> None:
+        self.threshold = threshold
+        self.window = window
+        self.lock_seconds = lock_seconds
+        self.max_chats = max_chats
+        self._joins: OrderedDict[int, deque[tuple[float, int]]] = OrderedDict()
+        self._locked: dict[int, float] = {}  # chat_id -> wall clock time the lock ends
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def joined(self, chat_id: int, user_id: int, now: float | None = None) -> list[int] | None:
+        """Record a join. Returns the users in the window if this join started a lockdown."""
+        if not self.enabled:
+            return None
+        now = time.time() if now is None else now
+        joins = self._joins.get(chat_id)
+        if joins is None:
+            joins = self._joins[chat_id] = deque(maxlen=self.threshold)
+            if len(self._joins) > self.max_chats:
+                self._joins.popitem(last=False)
+        else:
+            self._joins.move_to_end(chat_id)
+            if any(uid == user_id for _, uid in joins):
+                return None  # same join seen as service message and chat_member update
+        joins.append((now, user_id))
+
+        if len(joins) < self.threshold or now - joins[0][0] > self.window:
+            return None
+        if self.locked_until(chat_id, now):
+            self._locked[chat_id] = now + self.lock_seconds
+            return None
+        self._locked[chat_id] = now + self.lock_seconds
+        return [uid for _, uid in joins]
+
+    def locked_until(self, chat_id: int, now: float | None = None) -> float:
+        """Return when the chat's lockdown ends, or 0 if it is not locked."""
+        until = self._locked.get(chat_id, 0.0)
+        if until and until <= (time.time() if now is None else now):
+            del self._locked[chat_id]
+            return 0.0
+        return until
+
+    def lock(self, chat_id: int, seconds: float | None = None, now: float | None = None) -> float:
+        now = time.time() if now is None else now
+        self._locked[chat_id] = now + (self.lock_seconds if seconds is None else seconds)
+        return self._locked[chat_id]
+
+    def unlock(self, chat_id: int) -> bool:
+        self._joins.pop(chat_id, None)
+        return self._locked.pop(chat_id, None) is not None
+
+
+__all__ = ["RaidShield"]
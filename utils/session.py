@@ -0,0 +1,231 @@
+"""Pyrogram session storage kept in MongoDB.
+
+Hosts such as Heroku and Render wipe the filesystem on every restart, which
+loses the ``.session`` file: the bot then re-authorises and starts with an
+empty peer cache. This storage keeps the auth key and the peer cache in the
+bot's database instead. Peers are buffered in memory and written with one
+``bulk_write`` per batch, since Pyrogram reports them on almost every update.
+Every read and write goes through the database circuit breaker, so an outage
+costs a cache miss (Pyrogram then asks Telegram) rather than a stalled update.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from contextlib import suppress
+
+from pymongo import UpdateOne
+from pyrogram.storage import Storage
+from pyrogram.storage.sqlite_storage import get_input_peer
+
+from utils.db import get_db, guarded, guarded_write, OUTAGE_ERRORS
+
+logger = logging.getLogger(__name__)
+
+PEER_FLUSH_INTERVAL = 5.0  # seconds between peer batch writes
+PEER_BATCH_SIZE = 500  # wake the flush loop early once this many peers are waiting
+PEER_CACHE_SIZE = 50_000  # peers kept in memory for lookups
+PEER_MAX_UNFLUSHED = 5_000  # peers kept for retry while MongoDB is down; the oldest are dropped
+USERNAME_TTL = 8 * 60 * 60  # same expiry Pyrogram applies to cached usernames
+
+_SESSION_FIELDS = ("dc_id", "api_id", "test_mode", "auth_key", "date", "user_id", "is_bot")
+
+
+class MongoStorage(Storage):
+    """Drop-in replacement for Pyrogram's file storage, scoped by session ``name``."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self._session: dict = {}
+        self._peers: OrderedDict[int, tuple] = OrderedDict()  # id -> (access_hash, type, username, phone, ts)
+        self._dirty: dict[int, tuple] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_now = asyncio.Event()
+
+    # ---- lifecycle ---- #
+    async def open(self) -> None:
+        db = get_db()
+        self._sessions = db.pyrogram_sessions
+        self._peer_coll = db.pyrogram_peers
+        await self._peer_coll.create_index([("session", 1), ("peer_id", 1)], unique=True)
+        await self._peer_coll.create_index([("session", 1), ("username", 1)])
+        await self._peer_coll.create_index([("session", 1), ("phone_number", 1)])
+
+        doc = await self._sessions.find_one({"_id": self.name}) or {}
+        self._session = {field: doc.get(field) for field in _SESSION_FIELDS}
+        if self._session["dc_id"] is None:
+            self._session["dc_id"] = 2
+        if self._session["date"] is None:
+            self._session["date"] = 0
+        logger.info("🔑 Session %r loaded from MongoDB (%s)", self.name, "existing" if doc else "new")
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def save(self) -> None:
+        await self.date(int(time.time()))
+        await self._flush_peers()
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        await self._flush_peers()
+
+    async def delete(self) -> None:
+        await self._sessions.delete_one({"_id": self.name})
+        await self._peer_coll.delete_many({"session": self.name})
+        self._peers.clear()
+        self._dirty.clear()
+
+    # ---- peers ---- #
+    def _remember(self, peer_id: int, entry: tuple) -> None:
+        self._peers[peer_id] = entry
+        self._peers.move_to_end(peer_id)
+        if len(self._peers) > PEER_CACHE_SIZE:
+            self._peers.popitem(last=False)
+
+    async def update_peers(self, peers: list[tuple[int, int, str, str, str]]) -> None:
+        now = int(time.time())
+        for peer_id, access_hash, peer_type, username, phone_number in peers:
+            entry = (access_hash, peer_type, username, phone_number, now)
+            cached = self._peers.get(peer_id)
+            # Unchanged peers are only rewritten now and then, to keep usernames from expiring
+            if cached and cached[:4] == entry[:4] and now - cached[4] < USERNAME_TTL // 2:
+                continue
+            self._remember(peer_id, entry)
+            self._dirty[peer_id] = entry
+        # Never write from here: this runs inside Pyrogram's update handling
+        if len(self._dirty) >= PEER_BATCH_SIZE:
+            self._flush_now.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_now.wait(), PEER_FLUSH_INTERVAL)
+            self._flush_now.clear()
+            await self._flush_peers()
+
+    async def _flush_peers(self) -> None:
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            batch, self._dirty = self._dirty, {}
+            ops = [
+                UpdateOne(
+                    {"session": self.name, "peer_id": peer_id},
+                    {"$set": {
+                        "access_hash": access_hash,
+                        "type": peer_type,
+                        "username": username.lower() if username else None,
+                        "phone_number": phone_number,
+                        "last_update_on": ts,
+                    }},
+                    upsert=True,
+                )
+                for peer_id, (access_hash, peer_type, username, phone_number, ts) in batch.items()
+            ]
+            try:
+                await guarded(lambda: self._peer_coll.bulk_write(ops, ordered=False))
+            except Exception as exc:  # noqa: BLE001
+                # Older entries first, so the newest win and trimming drops the oldest
+                batch.update(self._dirty)
+                dropped = max(0, len(batch) - PEER_MAX_UNFLUSHED)
+                for peer_id in list(itertools.islice(batch, dropped)):
+                    del batch[peer_id]
+                self._dirty = batch
+                logger.warning(
+                    "Peer cache write failed (%d peers kept for retry, %d dropped): %s", len(batch), dropped, exc
+                )
+
+    def _input_peer(self, peer_id: int, entry: tuple):
+        access_hash, peer_type = entry[0], entry[1]
+        return get_input_peer(peer_id, access_hash, peer_type)
+
+    async def _load(self, query: dict) -> tuple[int, tuple] | None:
+        try:
+            doc = await guarded(lambda: self._peer_coll.find_one({"session": self.name, **query}))
+        except OUTAGE_ERRORS as exc:
+            logger.debug("Peer lookup skipped while MongoDB is unavailable: %s", exc)
+            return None
+        if doc is None:
+            return None
+        entry = (doc["access_hash"], doc["type"], doc.get("username"), doc.get("phone_number"), doc["last_update_on"])
+        self._remember(doc["peer_id"], entry)
+        return doc["peer_id"], entry
+
+    async def get_peer_by_id(self, peer_id: int):
+        entry = self._peers.get(peer_id)
+        if entry is None:
+            found = await self._load({"peer_id": peer_id})
+            if found is None:
+                raise KeyError(f"ID not found: {peer_id}")
+            entry = found[1]
+        return self._input_peer(peer_id, entry)
+
+    def _unflushed(self, index: int, value: str) -> tuple[int, tuple] | None:
+        """Find a peer that is still waiting to be written, by username (2) or phone (3)."""
+        for peer_id, entry in self._dirty.items():
+            field = entry[index]
+            if field and (field.lower() if index == 2 else field) == value:
+                return peer_id, entry
+        return None
+
+    async def get_peer_by_username(self, username: str):
+        # Lookups by username/phone go to MongoDB, which lacks peers not flushed yet
+        username = username.lower()
+        found = self._unflushed(2, username) or await self._load({"username": username})
+        if found is None:
+            raise KeyError(f"Username not found: {username}")
+        peer_id, entry = found
+        if abs(time.time() - entry[4]) > USERNAME_TTL:
+            raise KeyError(f"Username expired: {username}")
+        return self._input_peer(peer_id, entry)
+
+    async def get_peer_by_phone_number(self, phone_number: str):
+        found = self._unflushed(3, phone_number) or await self._load({"phone_number": phone_number})
+        if found is None:
+            raise KeyError(f"Phone number not found: {phone_number}")
+        return self._input_peer(*found)
+
+    # ---- session fields ---- #
+    async def _field(self, field: str, value):
+        if value is object:
+            return self._session.get(field)
+        self._session[field] = value
+        # Journaled like the bot's own writes, so an outage delays the update instead of failing it
+        await guarded_write(
+            lambda: self._sessions.update_one({"_id": self.name}, {"$set": {field: value}}, upsert=True)
+        )
+
+    async def dc_id(self, value: int = object):
+        return await self._field("dc_id", value)
+
+    async def api_id(self, value: int = object):
+        return await self._field("api_id", value)
+
+    async def test_mode(self, value: bool = object):
+        return await self._field("test_mode", value)
+
+    async def auth_key(self, value: bytes = object):
+        if value is object:
+            key = self._session.get("auth_key")
+            return bytes(key) if key is not None else None
+        return await self._field("auth_key", value)
+
+    async def date(self, value: int = object):
+        return await self._field("date", value)
+
+    async def user_id(self, value: int = object):
+        return await self._field("user_id", value)
+
+    async def is_bot(self, value: bool = object):
+        return await self._field("is_bot", value)
+
+
+__all__ = ["MongoStorage"]
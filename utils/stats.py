@@ -0,0 +1,58 @@
+"""Track which chats are active without writing to MongoDB per message."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime, timezone
+
+from utils.db import touch_active_chats
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FLUSH_INTERVAL = 60  # seconds between last_active writes
+
+_seen: set[int] = set()
+_task: asyncio.Task | None = None
+
+
+def touch(chat_id: int) -> None:
+    """Mark a chat as active; written out with the next flush."""
+    _seen.add(chat_id)
+
+
+async def flush() -> None:
+    if not _seen:
+        return
+    chat_ids = list(_seen)
+    _seen.clear()
+    await touch_active_chats(chat_ids, datetime.now(timezone.utc))
+
+
+async def _loop() -> None:
+    while True:
+        await asyncio.sleep(ACTIVE_FLUSH_INTERVAL)
+        try:
+            await flush()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to record active chats: %s", exc)
+
+
+def start_stats() -> None:
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_loop())
+
+
+async def stop_stats() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        with suppress(asyncio.CancelledError):
+            await _task
+        _task = None
+    await flush()
+
+
+__all__ = ["touch", "flush", "start_stats", "stop_stats"]
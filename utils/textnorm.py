@@ -0,0 +1,145 @@
+"""Canonical form of message text for content filters.
+
+Spammers dodge plain pattern matching with full-width or styled letters
+(``ｔ.ｍｅ``, ``𝐭.𝐦𝐞``), zero-width characters, look-alike letters from other
+scripts (Cyrillic ``е`` in ``tеlegram``) and split links (``t . me``,
+``example[.]com``). ``canonicalize`` undoes these in a single call: NFKC
+folding, dropping invisible characters, mapping homoglyphs to Latin inside
+words that already mix them with ASCII letters, then one regex that joins
+obfuscated separators between a host-like label and a known TLD. Plain ASCII
+text skips straight to the last step, and text without a dot or "dot" skips
+that too.
+
+Words written entirely in another script are left alone, so ``ТОР.КАК`` does
+not become a Latin domain and Russian ``сор`` does not match a blacklisted
+``cop``. The result is only ever matched against, never shown. Blacklist
+patterns go through the same function, so words in any script still match
+themselves."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+# Format and filler characters that render as nothing
+_INVISIBLE = [
+    0x00AD, 0x034F, 0x061C, 0x115F, 0x1160, 0x17B4, 0x17B5, 0x3164, 0xFEFF, 0xFFA0,
+    *range(0x180B, 0x1810),  # Mongolian variation selectors and vowel separator
+    *range(0x200B, 0x2010),  # zero-width space/joiners, direction marks
+    *range(0x202A, 0x202F),  # bidi embeddings and overrides
+    *range(0x2060, 0x2070),  # word joiner, invisible operators, bidi isolates
+    *range(0xFE00, 0xFE10),  # variation selectors
+    *range(0x1D173, 0x1D17B),  # musical formatting controls
+    *range(0xE0000, 0xE0080),  # tag characters
+    *range(0xE0100, 0xE01F0),  # variation selectors supplement
+]
+
+# Letters that NFKC leaves alone but render like Latin ones
+_HOMOGLYPHS = {
+    # Cyrillic
+    "А": "A", "В": "B", "Е": "E", "К": "K", "М": "M", "Н": "H", "О": "O", "Р": "P",
+    "С": "C", "Т": "T", "Х": "X", "У": "Y", "І": "I", "Ј": "J", "Ѕ": "S", "Ԁ": "D",
+    "а": "a", "е": "e", "о": "o", "р": "p", "с": "c", "у": "y", "х": "x", "і": "i",
+    "ј": "j", "ѕ": "s", "ԁ": "d", "һ": "h", "ӏ": "l", "ԛ": "q", "ԝ": "w",
+    # Greek
+    "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K", "Μ": "M",
+    "Ν": "N", "Ο": "O", "Ρ": "P", "Τ": "T", "Υ": "Y", "Χ": "X",
+    "α": "a", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p",
+    # Armenian
+    "օ": "o", "ս": "u", "հ": "h",
+}
+
+
+
+def _char_class(codepoints: list[int]) -> str:
+    """Regex class for ``codepoints``, with runs collapsed into ranges (far faster to scan)."""
+    runs: list[list[int]] = []
+    for cp in sorted(codepoints):
+        if runs and cp == runs[-1][1] + 1:
+            runs[-1][1] = cp
+        else:
+            runs.append([cp, cp])
+    return "[" + "".join(chr(a) if a == b else f"{chr(a)}-{chr(b)}" for a, b in runs) + "]"
+
+
+_INVISIBLE_RE = re.compile(_char_class(_INVISIBLE))
+_HOMOGLYPH_RE = re.compile("[" + "".join(_HOMOGLYPHS) + "]")
+_HOMOGLYPH_TABLE = {ord(src): dst for src, dst in _HOMOGLYPHS.items()}
+# Words with at least one ASCII letter; only those can be spoofed Latin words
+_LATIN_WORD_RE = re.compile(r"(?<!\S)[^\sA-Za-z]*[A-Za-z]\S*")
+
+_TLD_LIST = "com|net|org|io|ru|xyz|info|site|online|top|shop|app|link|club|live|biz|cc|gg".split("|")
+
+
+def _either_case(words: list[str]) -> str:
+    # "Net" after a full stop is a new sentence, so title case never counts as a TLD
+    return "(?:" + "|".join(words + [w.upper() for w in words]) + r")(?![A-Za-z0-9])"
+
+
+# "the dot com bubble" or "the shop . com is down" are prose; spaced or spelled-out
+# dots only count as a link when a path follows the TLD
+_TLD_PATH = "(?:" + "|".join(_TLD_LIST + [w.upper() for w in _TLD_LIST]) + ")/"
+_SUFFIX = _either_case(_TLD_LIST + ["me", "dog"])  # bracketed dots are deliberate, so t(.)me counts too
+_TELEGRAM = _either_case(["me", "dog"])
+_DOT = r"(?:\.|dot|DOT)"
+_BRACKETED_TAIL = rf"\s*{_DOT}\s*[\])}}>]\s*(?={_SUFFIX})"
+# Host-like label before the separator: two word characters, at least one a letter
+_HOST = r"(?:[A-Za-z][A-Za-z0-9-]|[A-Za-z0-9-][A-Za-z])"
+_LONE_T = r"(?<![\w'’])[tT]"  # a lone "t", not the end of "can't"
+
+
+def _after(*labels: str, sep: str) -> str:
+    """Lookbehind for ``sep`` preceded by any of ``labels``."""
+    return "(?:" + "|".join(f"(?<={label}{sep})" for label in labels) + ")"
+
+
+# Every alternative is a separator that stands for a single dot, joined only
+# between a host-like label and a known TLD (or "t"/"telegram" and me/dog).
+# Bracketed dots are never prose; spaced and spelled-out ones need a path.
+# Each one starts with whitespace, a dot or a bracket (context checks come
+# after the first character) so the regex engine can skip ordinary letters.
+_OPEN = r"[\[({<]"
+_HOST_SPACE = _after(_HOST, _LONE_T, sep=r"\s")
+_T_SPACE = _after(_LONE_T, r"\b(?:telegram|TELEGRAM)", sep=r"\s")
+_HOST_ONLY_SPACE = _after(_HOST, sep=r"\s")
+_HOST_OPEN = _after(_HOST, _LONE_T, sep=_OPEN)
+_T_DOT = _after(_LONE_T, r"\btelegram", r"\bTELEGRAM", sep=r"\.")
+_HOST_DOT = _after(_HOST, sep=r"\.")
+
+_SEPARATOR_RE = re.compile(
+    rf"\s(?:{_HOST_SPACE}\s*{_OPEN}{_BRACKETED_TAIL}"  # example [.] com
+    rf"|{_T_SPACE}(?:\s*\.\s*|\s*(?:dot|DOT)\s+|\s*(?=(?:me|dog|ME|DOG)/))(?={_TELEGRAM})"  # t . me, t dot me, t me/
+    rf"|{_HOST_ONLY_SPACE}\s*{_DOT}\s+(?={_TLD_PATH}))"  # example . com/x, example dot com/x
+    rf"|{_OPEN}{_HOST_OPEN}{_BRACKETED_TAIL}"  # example[.]com, t(dot)me
+    rf"|\.(?:{_T_DOT}\s+(?={_TELEGRAM})|{_HOST_DOT}\s+(?={_TLD_PATH}))"  # t. me, example. com/x
+)
+
+
+def _fold_homoglyphs(match: re.Match) -> str:
+    return match.group().translate(_HOMOGLYPH_TABLE)
+
+
+def canonicalize(text: str) -> str:
+    """Return ``text`` folded to the form content filters match against."""
+    if not text:
+        return ""
+    if not text.isascii():
+        if not unicodedata.is_normalized("NFKC", text):
+            text = unicodedata.normalize("NFKC", text)
+        text = _INVISIBLE_RE.sub("", text)
+        if "。" in text:
+            text = text.replace("。", ".")
+        # Fold look-alikes only inside words that mix them with ASCII letters:
+        # "tеlegram" is a spoof, an all-Cyrillic word is just Cyrillic
+        if _HOMOGLYPH_RE.search(text):
+            text = _LATIN_WORD_RE.sub(_fold_homoglyphs, text)
+    # Substring checks are far cheaper than the regex and rule out most messages
+    if "." in text:
+        return _SEPARATOR_RE.sub(".", text)
+    lower = text.lower()
+    if "dot" in lower or "me/" in lower or "dog/" in lower:
+        return _SEPARATOR_RE.sub(".", text)
+    return text
+
+
+__all__ = ["canonicalize"]
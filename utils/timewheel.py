@@ -0,0 +1,66 @@
+"""Hashed timing wheel for large numbers of coarse-grained deadlines."""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Hashable
+
+
+class TimingWheel:
+    """Expire keys at their deadline with O(1) add/remove and one sweep per tick.
+
+    Deadlines are rounded up to ``tick`` seconds and hashed into ``slots``
+    buckets; a bucket is only scanned when the wheel passes over it, so cost
+    grows with the number of keys actually expiring rather than with the
+    number pending. Deadlines further away than one revolution simply stay in
+    their bucket until the matching round comes up.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512) -> None:
+        self.tick = tick
+        self.slots = slots
+        self._buckets: list[dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._where: dict[Hashable, int] = {}  # key -> absolute tick it expires on
+        self._cursor = math.floor(time.time() / tick)
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def add(self, key: Hashable, deadline: float) -> None:
+        """Schedule ``key`` to expire at wall-clock ``deadline``, replacing any previous one."""
+        self.remove(key)
+        at = max(math.ceil(deadline / self.tick), self._cursor + 1)
+        self._buckets[at % self.slots][key] = at
+        self._where[key] = at
+
+    def remove(self, key: Hashable) -> bool:
+        at = self._where.pop(key, None)
+        if at is None:
+            return False
+        del self._buckets[at % self.slots][key]
+        return True
+
+    def advance(self, now: float | None = None) -> list[Hashable]:
+        """Move the wheel to ``now`` and return the keys whose deadline has passed."""
+        target = math.floor((time.time() if now is None else now) / self.tick)
+        expired: list[Hashable] = []
+        # After a long pause one full revolution visits every bucket
+        start = max(self._cursor + 1, target - self.slots + 1)
+        for at in range(start, target + 1):
+            bucket = self._buckets[at % self.slots]
+            if not bucket:
+                continue
+            due = [key for key, when in bucket.items() if when <= target]
+            for key in due:
+                del bucket[key]
+                del self._where[key]
+            expired.extend(due)
+        self._cursor = max(self._cursor, target)
+        return expired
+
+
+__all__ = ["TimingWheel"]
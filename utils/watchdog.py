@@ -0,0 +1,139 @@
+"""Event-loop lag monitor with blocking-call detection.
+
+A tick coroutine measures how late the loop wakes it up, which is the delay
+every other handler is seeing. A separate thread watches the tick heartbeat;
+when the loop stops ticking for longer than the threshold it captures the
+stack of the loop thread and names the handler and update that are blocking.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+TICK_INTERVAL = 0.1  # seconds between loop lag measurements
+HISTORY = 3000  # lag samples kept for percentiles (~5 minutes)
+
+_lags: deque[float] = deque(maxlen=HISTORY)
+_last_beat = 0.0
+_stalls = 0
+_task: asyncio.Task | None = None
+_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def lag_stats() -> dict:
+    """Return loop lag percentiles in milliseconds over the recent window."""
+    if not _lags:
+        return {"samples": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0, "stalls": _stalls}
+    ordered = sorted(_lags)
+    last = len(ordered) - 1
+
+    def pct(q: float) -> float:
+        return round(ordered[min(last, int(q * len(ordered)))] * 1e3, 1)
+
+    return {
+        "samples": len(ordered),
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "max": round(ordered[-1] * 1e3, 1),
+        "stalls": _stalls,
+    }
+
+
+def describe_update(args: tuple) -> str:
+    """Summarise the chat/user/message of a handler's update argument."""
+    for arg in args:
+        message = getattr(arg, "message", None) if hasattr(arg, "data") else arg
+        chat = getattr(message, "chat", None)
+        if chat is None:
+            continue
+        user = getattr(arg, "from_user", None)
+        return (
+            f"chat={chat.id} msg={getattr(message, 'id', '?')} "
+            f"user={user.id if user else '?'}"
+        )
+    return "unknown update"
+
+
+def _blocking_handler(frame) -> str | None:
+    """Find the ``catch_errors`` wrapper frame in the stack and describe its handler."""
+    while frame is not None:
+        if frame.f_code.co_name == "wrapper" and frame.f_code.co_filename.endswith("errors.py"):
+            local = frame.f_locals
+            func = local.get("func")
+            name = getattr(func, "__name__", "?")
+            return f"{name} ({describe_update(local.get('args', ()))})"
+        frame = frame.f_back
+    return None
+
+
+async def _tick() -> None:
+    global _last_beat
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + TICK_INTERVAL
+        _last_beat = time.monotonic()
+        await asyncio.sleep(TICK_INTERVAL)
+        _lags.append(max(0.0, loop.time() - expected))
+
+
+def _watch(loop_thread: int, threshold: float) -> None:
+    global _stalls
+    reported = False
+    while not _stop.wait(threshold / 4):
+        stalled = time.monotonic() - _last_beat
+        if stalled < threshold + TICK_INTERVAL:
+            reported = False
+            continue
+        if reported:
+            continue
+        reported = True
+        _stalls += 1
+        frame = sys._current_frames().get(loop_thread)
+        if frame is None:
+            continue
+        handler = _blocking_handler(frame) or "no handler (loop internals)"
+        stack = "".join(traceback.format_stack(frame))
+        logger.warning(
+            "🐢 Event loop blocked for %.0f ms in %s\n%s", stalled * 1e3, handler, stack
+        )
+
+
+def start_watchdog(threshold: float = 0.5) -> None:
+    """Start lag sampling and the stall detector. Call from inside the running loop."""
+    global _task, _thread, _last_beat
+    if _task is not None:
+        return
+    _last_beat = time.monotonic()
+    _stop.clear()
+    _task = asyncio.create_task(_tick())
+    _thread = threading.Thread(
+        target=_watch, args=(threading.get_ident(), threshold), name="loop-watchdog", daemon=True
+    )
+    _thread.start()
+    logger.info("Loop watchdog active (threshold %.0f ms)", threshold * 1e3)
+
+
+async def stop_watchdog() -> None:
+    global _task, _thread
+    _stop.set()
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    _thread = None
+
+
+__all__ = ["lag_stats", "describe_update", "start_watchdog", "stop_watchdog"]
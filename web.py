@@ -1,6 +1,18 @@
 import logging
 import os
-from flask import Flask
+from datetime import datetime, timedelta, timezone
+
+from flask import Flask, abort, jsonify, request
+
+# Read straight from the environment: importing config or utils would require the
+# bot's own settings (BOT_TOKEN, …) and Motor just to answer /health
+MONGO_URI = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB = os.environ.get("MONGO_DB", "oxygen")
+STATS_TOKEN = os.environ.get("STATS_TOKEN", "")
+
+# Same values as in utils.db
+ACTIVE_CHAT_WINDOW = 24 * 3600
+STATS_TOTALS_ID = "global"
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -9,11 +21,45 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+_mongo = None
+
+
+def _db():
+    global _mongo
+    if _mongo is None:
+        from pymongo import MongoClient
+
+        _mongo = MongoClient(MONGO_URI, serverSelectionTimeoutMS=3000)
+    return _mongo[MONGO_DB]
 
 @app.route("/health")
 def health() -> str:
     return "OK"
 
+@app.route("/stats")
+def stats():
+    """Same numbers as the owner /stats command, from metadata, indexes and counters only."""
+    # Without a configured token the endpoint stays closed
+    if not STATS_TOKEN or (request.args.get("token") != STATS_TOKEN
+                           and request.headers.get("Authorization") != f"Bearer {STATS_TOKEN}"):
+        abort(403)
+    from pymongo import DESCENDING
+
+    db = _db()
+    since = datetime.now(timezone.utc) - timedelta(seconds=ACTIVE_CHAT_WINDOW)
+    top = db.chat_stats.find(
+        {"violations": {"$gt": 0}}, {"_id": 0, "chat_id": 1, "violations": 1}
+    ).sort("violations", DESCENDING).limit(5)
+    return jsonify(
+        users=db.users.estimated_document_count(),
+        groups=db.groups.estimated_document_count(),
+        approved=db.approved_users.estimated_document_count(),
+        audit_events=db.audit_log.estimated_document_count(),
+        active_chats=db.chat_stats.count_documents({"last_active": {"$gte": since}}),
+        totals=db.stats_totals.find_one({"_id": STATS_TOTALS_ID}, {"_id": 0}) or {},
+        top_chats=list(top),
+    )
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
     logger.info("Starting Flask health server on port %s", port)